@@ -1,47 +1,284 @@
 import os
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import time
+import queue
+import atexit
+import threading
+import hashlib
+import functools
+import logging
+
+try:
+    import orjson as _json  # ~2-3x faster parsing of the LLM's JSON replies
+except ImportError:
+    _json = json
 # import psycopg2  # Commented out PostgreSQL in favor of SQLite
 import sqlite3  # Added for simpler local database
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from llm import LLMClient  # Import the LLM client
 from tools.weather_providers import OpenWeatherProvider, WeatherAPIProvider
 from tools.brave_search import BraveSearch
 from tool_registry import ToolRegistry, Tool, ToolCategory
 from tools.activity_suggester import ActivitySuggester
+from tools.city_index import is_known_city, remember_city
 from typing import Optional
 
 load_dotenv()
 
+# Per-query progress goes through logging rather than print: the interactive
+# CLI enables INFO so the play-by-play looks the same, while evaluator/batch
+# runs can silence it (and skip the stdout lock) by raising the level.
+logger = logging.getLogger(__name__)
+
+# How long a verified city name stays valid in the cache (24 hours).
+# City -> country mappings don't change, but keeping a TTL lets stale or
+# mistaken LLM verifications age out instead of being wrong forever.
+CITY_CACHE_TTL = 24 * 60 * 60
+
+# TTLs (seconds) for cached tool results. Current weather goes stale quickly;
+# forecasts and activity suggestions change much more slowly, so users
+# re-asking about the same city within these windows skip the HTTP/LLM calls.
+TOOL_CACHE_TTLS = {
+    "get_current_weather": 10 * 60,
+    "get_weather_forecast": 60 * 60,
+    "get_activity_suggestion": 60 * 60,
+}
+TOOL_CACHE_MAX_ENTRIES = 128
+
+# Whole-response cache sizing - see WeatherAgent._response_cache_key for the
+# time-bucketing that bounds staleness
+RESPONSE_CACHE_MAX_ENTRIES = 128
+
+# Canonical vocabulary for condition strings in cache keys - provider
+# phrasings that mean the same thing should share a cache entry
+_CANON_CONDITIONS = {
+    "clear sky": "clear",
+    "sunny": "clear",
+    "mostly sunny": "clear",
+    "few clouds": "cloudy",
+    "scattered clouds": "cloudy",
+    "broken clouds": "cloudy",
+    "overcast clouds": "cloudy",
+    "overcast": "cloudy",
+    "partly cloudy": "cloudy",
+    "mist": "fog",
+    "haze": "fog",
+    "light rain": "rain",
+    "moderate rain": "rain",
+    "heavy intensity rain": "rain",
+    "shower rain": "rain",
+    "light intensity drizzle": "rain",
+    "drizzle": "rain",
+    "light snow": "snow",
+    "heavy snow": "snow",
+    "thunderstorm": "storm",
+}
+
+
+def _canonical_conditions(conditions: str) -> str:
+    """Map a provider's condition phrasing onto the canonical vocabulary"""
+    normalized = conditions.lower().strip()
+    return _CANON_CONDITIONS.get(normalized, normalized)
+
+# Indexes into the agent's API-call counter array - a fixed-layout array of
+# unsigned ints is cheaper to bump on the hot path than a dict of counters
+_API_WEATHER, _API_FORECAST, _API_SEARCH, _API_TOTAL = range(4)
+
+# Pre-compiled patterns for intent detection and entity extraction -
+# compiled once at import time instead of being re-looked-up per query.
+# The three intent categories are fused into one alternation with named
+# groups so a single scan of the query classifies it; case-insensitive,
+# so no lowercased copy of the query is needed.
+_INTENT_RE = re.compile(
+    r'\b(?P<current>current|now|today)\b'
+    r'|\b(?P<history>history|last week|past)\b'
+    r'|\b(?P<forecast>forecast|tomorrow|next|upcoming|this weekend|next week|future)\b',
+    re.I
+)
+_TIME_REF = re.compile(r'\b(tomorrow|next|upcoming|this weekend|next week|future)\b', re.I)
+# City verification prompt skeleton - built once at import; only the
+# location is substituted per call (%-style to avoid escaping the JSON braces)
+_VERIFY_PROMPT_TEMPLATE = (
+    "Analyze the location '%s' and provide information in the following JSON format:\n"
+    "{\n"
+    '  "is_valid": true/false,\n'
+    '  "city": "Correct city name with proper capitalization",\n'
+    '  "country": "Primary country where this city is located",\n'
+    '  "alternates": ["Country1", "Country2"],  // If same city name exists in multiple countries\n'
+    '  "confidence": 0.0-1.0,  // How confident in this identification\n'
+    '  "disambiguation": "Additional context if needed"\n'
+    "}\n\n"
+    "Example response:\n"
+    "{\n"
+    '  "is_valid": true,\n'
+    '  "city": "Cambridge",\n'
+    '  "country": "United Kingdom",\n'
+    '  "alternates": ["United States"],\n'
+    '  "confidence": 0.9,\n'
+    '  "disambiguation": "Major cities named Cambridge exist in both the UK and USA (Massachusetts)"\n'
+    "}\n\n"
+    "Provide only the JSON response, no additional text."
+)
+
+# Typed view of the city-verification reply. With msgspec installed the JSON
+# is decoded and validated straight into the struct in C; otherwise a plain
+# dataclass is filled from the parsed dict. Either way the hot path reads
+# attributes instead of chaining dict .get() lookups.
+try:
+    import msgspec
+
+    class CityResult(msgspec.Struct):
+        is_valid: bool = False
+        city: str = ""
+        country: str = ""
+        alternates: list = []
+        confidence: float = 0.0
+        disambiguation: str = ""
+
+    def _decode_city_result(content: str) -> CityResult:
+        return msgspec.json.decode(content.encode(), type=CityResult)
+except ImportError:
+    from dataclasses import dataclass, field
+
+    @dataclass
+    class CityResult:
+        is_valid: bool = False
+        city: str = ""
+        country: str = ""
+        alternates: list = field(default_factory=list)
+        confidence: float = 0.0
+        disambiguation: str = ""
+
+    def _decode_city_result(content: str) -> "CityResult":
+        data = _json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        return CityResult(
+            is_valid=bool(data.get('is_valid', False)),
+            city=data.get('city') or "",
+            country=data.get('country') or "",
+            alternates=data.get('alternates') or [],
+            confidence=data.get('confidence') or 0.0,
+            disambiguation=data.get('disambiguation') or "",
+        )
+
+_CITY_PATTERNS = [re.compile(p, re.I) for p in (
+    r'\b(?:in|at|for|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+    r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*?)(?:\s+(?:weather|temperature|forecast))',
+    r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),\s*[A-Z]{2}\b'
+)]
+
+@functools.lru_cache(maxsize=4)
+def _compute_weekend_dates(today_date, past_sat_evening):
+    """Compute the next weekend's dates and how many forecast days cover them
+
+    Cached per (date, Saturday-evening) bucket, so repeated weekend queries
+    on the same day reuse the date math and strftime results.
+    """
+    # Find the next Saturday (weekday 5)
+    days_to_saturday = (5 - today_date.weekday()) % 7
+    if days_to_saturday == 0 and past_sat_evening:
+        # It's already Saturday evening, so target next weekend
+        days_to_saturday = 7
+
+    next_saturday = today_date + timedelta(days=days_to_saturday)
+    next_sunday = next_saturday + timedelta(days=1)
+
+    # Request enough days to include both Saturday and Sunday
+    return (next_saturday.strftime('%Y-%m-%d'),
+            next_sunday.strftime('%Y-%m-%d'),
+            days_to_saturday + 2)
+
+@functools.lru_cache(maxsize=4)
+def _build_http_services(provider_name, weather_api_key, brave_api_key):
+    """One warm service stack per credential set for the process lifetime
+
+    Registries get re-created by tests and hot reloads; memoizing the pooled
+    session, weather provider and BraveSearch on (provider, keys) means a new
+    registry reuses the warm TLS connections instead of rebuilding them.
+    """
+    if not weather_api_key:
+        raise ValueError("WEATHER_API_KEY environment variable is required")
+
+    # Shared HTTP session - every tool talks to the same few hosts
+    # repeatedly, so one pooled session with keep-alive avoids paying a
+    # TCP+TLS handshake on each call. Retries cover transient 5xx/429s.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if provider_name == 'openweather':
+        weather_provider = OpenWeatherProvider(weather_api_key, session=session)
+    elif provider_name == 'weatherapi':
+        weather_provider = WeatherAPIProvider(weather_api_key, session=session)
+    else:
+        raise ValueError(f"Unsupported weather provider: {provider_name}")
+
+    return session, weather_provider, BraveSearch(brave_api_key, session=session)
+
 # ===== TOOL REGISTRY LAYER =====
 # The tool registry serves as a catalog of capabilities that the agent can reason about and utilize
 class WeatherAgentToolRegistry(ToolRegistry):
-    def __init__(self):
+    def __init__(self, metadata_only=False):
         super().__init__()
+        # metadata_only registers the tool catalog with no implementations -
+        # enough for listing tools without paying for provider/LLM construction
+        self.metadata_only = metadata_only
         self._initialize_tools()
-    
+
     def _initialize_tools(self) -> None:
         """Initialize and register all tools that the agent can use for reasoning and execution"""
-        # Initialize service providers
-        weather_provider = self._get_weather_provider()
-        brave_search = BraveSearch(os.getenv('BRAVE_API_KEY'))
-        
-        # Initialize LLM client for activity suggester
-        llm_client = LLMClient(
-            provider=os.getenv("LLM_PROVIDER") or "together",
-            model=os.getenv("LLM_MODEL") or "mistralai/Mixtral-8x7B-Instruct-v0.1"
-        )
-        
-        # Initialize activity suggester
-        activity_suggester = ActivitySuggester(brave_search, llm_client)
-        
+        if self.metadata_only:
+            weather_fn = forecast_fn = search_fn = activity_fn = None
+        else:
+            # Initialize service providers through the memoized factory - a
+            # re-created registry gets the same warm instances back
+            self._session, weather_provider, brave_search = _build_http_services(
+                os.getenv('WEATHER_PROVIDER', 'openweather'),
+                os.getenv('WEATHER_API_KEY'),
+                os.getenv('BRAVE_API_KEY')
+            )
+
+            # Initialize LLM client for activity suggester
+            llm_client = LLMClient(
+                provider=os.getenv("LLM_PROVIDER") or "together",
+                model=os.getenv("LLM_MODEL") or "mistralai/Mixtral-8x7B-Instruct-v0.1"
+            )
+
+            # Initialize activity suggester
+            activity_suggester = ActivitySuggester(brave_search, llm_client)
+
+            # Keep direct references so the agent can reuse these instances
+            # instead of constructing duplicates
+            self.weather_provider = weather_provider
+            self.brave = brave_search
+            self.activity_suggester = activity_suggester
+
+            weather_fn = weather_provider.get_current_weather
+            forecast_fn = weather_provider.get_forecast
+            search_fn = brave_search.search
+            activity_fn = activity_suggester.get_activity_suggestion
+
         # Register weather tool
         self.register_tool(Tool(
             name="get_current_weather",
             description="Get current weather conditions for a specified city",
             category=ToolCategory.EXTERNAL_API,
-            function=weather_provider.get_current_weather,
+            function=weather_fn,
             parameters={
                 "city": {
                     "type": "string",
@@ -56,7 +293,7 @@ class WeatherAgentToolRegistry(ToolRegistry):
             name="get_weather_forecast",
             description="Get weather forecast for a specified city",
             category=ToolCategory.EXTERNAL_API,
-            function=weather_provider.get_forecast,
+            function=forecast_fn,
             parameters={
                 "city": {
                     "type": "string",
@@ -75,7 +312,7 @@ class WeatherAgentToolRegistry(ToolRegistry):
             name="web_search",
             description="Perform a web search using Brave Search API",
             category=ToolCategory.EXTERNAL_API,
-            function=brave_search.search,
+            function=search_fn,
             parameters={
                 "query": {
                     "type": "string",
@@ -90,7 +327,7 @@ class WeatherAgentToolRegistry(ToolRegistry):
             name="get_activity_suggestion",
             description="Get weather-appropriate activity suggestions for a location using LLM-enhanced search",
             category=ToolCategory.EXTERNAL_API,
-            function=activity_suggester.get_activity_suggestion,
+            function=activity_fn,
             parameters={
                 "city": {
                     "type": "string",
@@ -114,18 +351,12 @@ class WeatherAgentToolRegistry(ToolRegistry):
     
     def _get_weather_provider(self):
         """Initialize the appropriate weather provider based on configuration"""
-        provider_name = os.getenv('WEATHER_PROVIDER', 'openweather')
-        api_key = os.getenv('WEATHER_API_KEY')
-        
-        if not api_key:
-            raise ValueError("WEATHER_API_KEY environment variable is required")
-        
-        if provider_name == 'openweather':
-            return OpenWeatherProvider(api_key)
-        elif provider_name == 'weatherapi':
-            return WeatherAPIProvider(api_key)
-        else:
-            raise ValueError(f"Unsupported weather provider: {provider_name}")
+        _, weather_provider, _ = _build_http_services(
+            os.getenv('WEATHER_PROVIDER', 'openweather'),
+            os.getenv('WEATHER_API_KEY'),
+            os.getenv('BRAVE_API_KEY')
+        )
+        return weather_provider
 
 # ===== AGENT LAYER =====
 # The main agent class that implements the reasoning layer and orchestrates the tools
@@ -133,9 +364,9 @@ class WeatherAgent:
     def __init__(self, weather_provider_name="openweather", llm_model=None, llm_provider=None):
         # Handle list models request before initializing LLM
         if llm_model == "list":
-            print("\nAvailable LLM models:")
+            logger.info("\nAvailable LLM models:")
             for model, details in LLMClient.MODELS.items():
-                print(f"→ {model} (${details['cost']['input']}/1K input tokens)")
+                logger.info(f"→ {model} (${details['cost']['input']}/1K input tokens)")
             return
             
         # Use specified provider with optional model selection
@@ -144,29 +375,61 @@ class WeatherAgent:
             model=llm_model or os.getenv("LLM_MODEL") or "mistralai/Mixtral-8x7B-Instruct-v0.1"  # Ensure default model
         )
         
-        print(f"\nUsing LLM Model: {self.llm.model} via {self.llm.provider}")
+        logger.info(f"\nUsing LLM Model: {self.llm.model} via {self.llm.provider}")
+
+        # Capability check done once here - the per-call log sites invoke
+        # _log_llm_cost instead of re-running the hasattr chain every time
+        self._has_cost_tracker = (hasattr(self.llm, 'cost_tracker')
+                                  and hasattr(self.llm.cost_tracker, 'last_call_info'))
         
         # Initialize tool registry (which will set up weather provider and other tools)
         os.environ['WEATHER_PROVIDER'] = weather_provider_name
         self.tool_registry = WeatherAgentToolRegistry()
         
-        # Initialize components
-        self.weather_provider = self.tool_registry._get_weather_provider()
-        self.brave = BraveSearch(os.getenv('BRAVE_API_KEY'))
-        
-        # Get the activity suggester from the tool registry
-        activity_tool = self.tool_registry.get_tool("get_activity_suggestion")
-        self.activity_suggester = activity_tool.function.__self__ if activity_tool else ActivitySuggester(self.brave, self.llm)
-        
-        # Track API calls that aren't LLM calls
-        self.api_calls = {
-            "weather": 0,
-            "forecast": 0,
-            "search": 0,
-            "total": 0
-        }
+        # Reuse the instances the registry already built - constructing a
+        # second weather provider and BraveSearch here just duplicated
+        # API-key validation and connection setup
+        self.weather_provider = self.tool_registry.weather_provider
+        self.brave = self.tool_registry.brave
+        self.activity_suggester = self.tool_registry.activity_suggester
         
+        # Track API calls that aren't LLM calls - stored as a fixed-index
+        # counter array; the api_calls property exposes the dict view
+        self._api_calls = array('Q', [0, 0, 0, 0])
+
         self.db = self._init_db()
+
+        # Interactions are fed through a queue to a daemon writer thread that
+        # batches them into single transactions, so no query ever blocks on a
+        # commit. close() (also registered atexit) flushes what's left.
+        self._log_queue = queue.Queue()
+        self._log_writer = threading.Thread(target=self._log_writer_loop, daemon=True)
+        self._log_writer.start()
+        atexit.register(self.close)
+
+        # In-memory LRU cache of verified city names, backed by the city_cache
+        # table in SQLite so hits survive restarts. Keyed by the normalized
+        # candidate city string; avoids an LLM verification call on repeats.
+        self._city_cache = OrderedDict()
+        self._city_cache_max = 1024
+
+        # Worker pool for overlapping independent network calls (weather
+        # fetch runs in parallel with a speculative search prefetch)
+        self._pool = ThreadPoolExecutor(max_workers=4)
+
+        # Single-worker executor for post-response work (DB persistence and
+        # summary printing) - one worker so SQLite writes stay serialized
+        self._bg = ThreadPoolExecutor(max_workers=1)
+
+        # Whole-response LRU cache keyed by (intent, city, time bucket).
+        # A repeat of "weather in Tokyo" within the bucket returns the
+        # previous answer without touching the pipeline at all.
+        self._response_cache = OrderedDict()
+
+        # LRU cache of tool results keyed by (tool name, arguments), with
+        # per-tool TTLs from TOOL_CACHE_TTLS. Re-asking about the same city
+        # within the TTL reuses the stored result instead of re-fetching.
+        self._tool_cache = OrderedDict()
     
     """
     # PostgreSQL implementation - commented out in favor of simpler SQLite
@@ -192,7 +455,18 @@ class WeatherAgent:
     def _init_db(self):
         # SQLite implementation - simpler local database without requiring a server
         db_path = os.path.join(os.path.dirname(__file__), 'weather_agent.db')
-        conn = sqlite3.connect(db_path)
+        # check_same_thread=False because the background persistence worker
+        # writes from its own thread; sqlite3's serialized mode plus the WAL
+        # settings below make the cross-thread access safe
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL lets readers proceed while we write, and NORMAL synchronous
+        # avoids an fsync per commit (safe with WAL - a crash can only lose
+        # the last transactions, never corrupt the database)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')  # ~20MB page cache
         with conn:
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS interactions (
@@ -202,99 +476,324 @@ class WeatherAgent:
                     response TEXT
                 )
             ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS city_cache (
+                    key TEXT PRIMARY KEY,
+                    city TEXT,
+                    country TEXT,
+                    ts INTEGER
+                )
+            ''')
         return conn
+
+    def warmup(self):
+        """Pre-establish TLS connections to the weather and search hosts
+
+        One agent instance is shared across all evaluator workers; warming
+        the pooled session up front keeps the first burst of concurrent
+        queries from each paying a DNS + TCP + TLS handshake.
+        """
+        session = getattr(self.tool_registry, '_session', None)
+        if session is None:
+            return
+        weather_host = self.weather_provider.base_endpoint.split('/')[0]
+        for url in (f"https://{weather_host}", "https://api.search.brave.com"):
+            try:
+                session.head(url, timeout=(3, 5))
+            except requests.RequestException:
+                pass  # warmup is best-effort; real calls will retry anyway
+
+        # The LLM client keeps its own session (its auth header must not be
+        # shared with the other hosts) - warm that connection too
+        llm_session = getattr(self.llm, '_session', None)
+        if llm_session is not None:
+            try:
+                llm_session.head(self.llm.api_url, timeout=(3, 5))
+            except requests.RequestException:
+                pass
+
+    def _log_llm_cost(self):
+        """Print token usage and cost for the most recent LLM call"""
+        if not self._has_cost_tracker:
+            return
+        last_call = self.llm.cost_tracker.last_call_info
+        if not last_call:
+            return
+        input_tokens = last_call.input_tokens
+        output_tokens = last_call.output_tokens
+        cost = last_call.cost
+        if not isinstance(cost, (int, float)):
+            return  # e.g. a fully mocked client in tests
+        logger.info(f"💰 LLM call: {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
+
+    @property
+    def api_calls(self):
+        """Dict view of the API-call counters for summaries and callers"""
+        return {
+            "weather": self._api_calls[_API_WEATHER],
+            "forecast": self._api_calls[_API_FORECAST],
+            "search": self._api_calls[_API_SEARCH],
+            "total": self._api_calls[_API_TOTAL],
+        }
+
+    # ===== CITY VERIFICATION CACHE =====
+    # Avoids paying an LLM roundtrip to re-verify city names we have already
+    # verified recently. Exact-match only: the LLM providers used here don't
+    # expose an embeddings endpoint, so there is no similarity fallback tier.
+    def _city_cache_get(self, key):
+        """Look up a previously verified city: memory first, then SQLite"""
+        now = int(time.time())
+
+        if entry := self._city_cache.get(key):
+            city, ts = entry
+            if now - ts < CITY_CACHE_TTL:
+                self._city_cache.move_to_end(key)
+                return city
+            # pop, not del: evaluator workers share this agent and two
+            # threads can race the same expired key
+            self._city_cache.pop(key, None)
+
+        row = self.db.execute(
+            'SELECT city, ts FROM city_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row and now - row[1] < CITY_CACHE_TTL:
+            self._city_cache[key] = (row[0], row[1])
+            return row[0]
+        return None
+
+    def _city_cache_put(self, key, city, country):
+        """Store a verified city in memory and SQLite with the current timestamp"""
+        now = int(time.time())
+        self._city_cache[key] = (city, now)
+        while len(self._city_cache) > self._city_cache_max:
+            self._city_cache.popitem(last=False)
+
+        with self.db:
+            self.db.execute('''
+                INSERT OR REPLACE INTO city_cache (key, city, country, ts)
+                VALUES (?, ?, ?, ?)
+            ''', (key, city, country, now))
     
+    # Batch size for the interaction-log writer: collapse up to this many
+    # queued rows into one transaction
+    _LOG_BATCH_SIZE = 64
+
+    def _log_writer_loop(self):
+        """Drain the interaction queue in batches and write each batch in a
+        single transaction. Runs on a daemon thread; a None sentinel (sent by
+        close) flushes whatever is queued and stops the loop."""
+        while True:
+            try:
+                row = self._log_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if row is None:
+                return
+            rows = [row]
+            # Pick up whatever else is already queued, up to the batch limit
+            while len(rows) < self._LOG_BATCH_SIZE:
+                try:
+                    nxt = self._log_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._write_interactions(rows)
+                    return
+                rows.append(nxt)
+            self._write_interactions(rows)
+
+    def _write_interactions(self, rows):
+        try:
+            with self.db:
+                self.db.executemany('''
+                    INSERT INTO interactions (query, response)
+                    VALUES (?, ?)
+                ''', rows)
+        except sqlite3.Error as e:
+            # Drop the batch but keep the writer alive - losing a few log rows
+            # beats silently never logging again
+            logger.warning(f"⚠️ Failed to write {len(rows)} interaction(s): {e}")
+
+    def close(self):
+        """Flush pending interaction logs and stop the writer thread"""
+        if self._log_writer.is_alive():
+            self._log_queue.put(None)
+            self._log_writer.join(timeout=5)
+
+    # ===== RESPONSE CACHE =====
+    def _response_cache_key(self, intent, city, qualifier=""):
+        """Time-bucketed response cache key: current-weather answers are
+        reusable for 10 minutes, forecast answers for an hour. Bucketing the
+        timestamp into the key means entries expire without any TTL scan.
+        The qualifier keeps different forecast questions ("tomorrow" vs
+        "this weekend") from colliding on the same entry."""
+        bucket = int(time.time() // (600 if intent == "current" else 3600))
+        return hashlib.sha1(f"{intent}|{city.lower()}|{qualifier}|{bucket}".encode()).hexdigest()
+
+    # ===== TOOL RESULT CACHE =====
+    def _tool_cache_key(self, name, kwargs):
+        """Build a stable cache key from the tool name and its arguments"""
+        payload = json.dumps({"name": name, "args": kwargs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cached_tool_call(self, name, func, key_args=None, counter=None,
+                          lazy_kwargs=None, **kwargs):
+        """Execute a tool call through the TTL'd result cache
+
+        Args:
+            name: Tool name (selects the TTL from TOOL_CACHE_TTLS)
+            func: Callable to invoke on a cache miss
+            key_args: Optional normalized arguments to key the cache with
+                      (e.g. bucketed temperature) instead of the raw kwargs
+            counter: api_calls counter to bump when a real call is made
+            lazy_kwargs: argument name -> Future, resolved only on a cache
+                      miss so a hit never blocks on speculative work (which
+                      is best-effort cancelled instead)
+        """
+        ttl = TOOL_CACHE_TTLS.get(name)
+        if ttl is None:
+            if lazy_kwargs:
+                kwargs.update((arg, future.result()) for arg, future in lazy_kwargs.items())
+            return func(**kwargs)
+
+        key = self._tool_cache_key(name, key_args if key_args is not None else kwargs)
+        now = time.monotonic()
+
+        if entry := self._tool_cache.get(key):
+            expiry, value = entry
+            if now < expiry:
+                self._tool_cache.move_to_end(key)
+                logger.info(f"→ Using cached result for {name}")
+                if lazy_kwargs:
+                    for future in lazy_kwargs.values():
+                        future.cancel()  # no-op if it already started
+                return value
+            self._tool_cache.pop(key, None)  # pop, not del: races with other workers
+
+        if lazy_kwargs:
+            kwargs.update((arg, future.result()) for arg, future in lazy_kwargs.items())
+        value = func(**kwargs)
+        if counter is not None:
+            self._api_calls[counter] += 1
+            self._api_calls[_API_TOTAL] += 1
+
+        # Don't cache failed/empty lookups - they should be retried next time.
+        # Weather providers signal failure with a truthy dict whose fields
+        # are None, so check for that shape too.
+        is_error = isinstance(value, dict) and 'temp' in value and value['temp'] is None
+        if value and not is_error:
+            self._tool_cache[key] = (now + ttl, value)
+            while len(self._tool_cache) > TOOL_CACHE_MAX_ENTRIES:
+                self._tool_cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _normalize_weather_key(city, weather, is_forecast):
+        """Normalize weather data for cache-key purposes: quantize the
+        temperature into 5°C buckets and canonicalize the conditions so
+        near-identical weather (20.5°C 'clear sky' vs 21°C 'sunny') shares
+        one cache entry - the recommendation wouldn't differ anyway"""
+        temp = weather.get('temp')
+        if isinstance(temp, (int, float)):
+            temp = int(temp // 5) * 5
+        return {
+            'city': city.lower(),
+            'temp': temp,
+            'conditions': _canonical_conditions(str(weather.get('conditions', ''))),
+            'is_forecast': is_forecast
+        }
+
     # ===== REASONING LAYER =====
     # This is the core reasoning layer that processes user queries and orchestrates tool selection
     def process_query(self, query):
-        print(f"\nProcessing: {query}")
-        print("-----------------------------------")
+        logger.info(f"\nProcessing: {query}")
+        logger.info("-----------------------------------")
         
         # 1. Intent detection - First reasoning step: understand what the user is asking for
-        print("\n🤔 Thinking: Understanding what weather information you need...")
+        logger.info("\n🤔 Thinking: Understanding what weather information you need...")
         intent = self._detect_intent(query)
-        print(f"→ Detected intent: {intent}")
+        logger.info(f"→ Detected intent: {intent}")
         
         # 2. Entity extraction - Second reasoning step: identify the location in the query
-        print("\n🤔 Thinking: Identifying the location you're asking about...")
+        logger.info("\n🤔 Thinking: Identifying the location you're asking about...")
         city = self._extract_city(query)
         if not city:
             response = "I couldn't understand which city you're asking about. Please specify a city name clearly, like 'weather in San Francisco' or 'Tokyo weather'."
-            print("→ Could not identify a valid city name")
+            logger.info("→ Could not identify a valid city name")
             return response
         
-        print(f"→ Target location: {city}")
-        
+        logger.info(f"→ Target location: {city}")
+
+        # Whole-response cache check - a repeated query for the same intent,
+        # city, time phrase and time bucket skips the pipeline entirely
+        time_reference = _TIME_REF.search(query)
+        time_qualifier = time_reference.group(0).lower() if time_reference else ""
+        response_key = self._response_cache_key(intent, city, time_qualifier)
+        if cached_response := self._response_cache.get(response_key):
+            logger.info("→ Using cached response")
+            self._response_cache.move_to_end(response_key)
+            self._bg.submit(self._persist_and_summarize, query, cached_response)
+            return cached_response
+
         # 3. Tool selection and execution - Third reasoning step: select and use appropriate tools
-        print("\nStep 3: Retrieving weather information")
+        logger.info("\nStep 3: Retrieving weather information")
         if intent == "current":
             # Dynamic tool selection based on intent - current weather
-            print(f"→ Fetching current weather for {city}...")
+            logger.info(f"→ Fetching current weather for {city}...")
             weather_tool = self.tool_registry.get_tool("get_current_weather")
             try:
-                print("🔧 Using tool: get_current_weather")
-                # Tool execution with extracted parameters
-                result = weather_tool.execute(city=city)
-                # Track API call
-                self.api_calls["weather"] += 1
-                self.api_calls["total"] += 1
-                
-                if result['temp'] == 'unknown':
-                    print("→ Could not retrieve weather data from API")
+                logger.info("🔧 Using tool: get_current_weather")
+                # Fetch the weather and speculatively prefetch search results
+                # for the city in parallel - if the weather comes back usable,
+                # the activity suggester reuses the prefetched results and
+                # skips its own search roundtrip
+                fut_weather = self._pool.submit(
+                    self._cached_tool_call, "get_current_weather",
+                    weather_tool.execute, counter=_API_WEATHER, city=city
+                )
+                fut_search = self._pool.submit(self.brave.search, f"tourist attractions {city}")
+                result = fut_weather.result()
+
+                if result['temp'] is None:
+                    logger.info("→ Could not retrieve weather data from API")
                     response = f"I'm sorry, I couldn't get the current weather for {city}."
                 else:
-                    print(f"→ Successfully retrieved weather data: {result['temp']}°C, {result['conditions']}")
+                    logger.info(f"→ Successfully retrieved weather data: {result['temp']}°C, {result['conditions']}")
                     response = f"Current weather in {city}: {result['temp']}°C, {result['conditions']}"
                     
                     # Tool chaining - using a second tool based on the results of the first
-                    print("🔧 Using tool: get_activity_suggestion")
-                    if suggestion := self.activity_suggester.get_activity_suggestion(city, result, is_forecast=False):
+                    logger.info("🔧 Using tool: get_activity_suggestion")
+                    if suggestion := self._cached_tool_call(
+                        "get_activity_suggestion", self.activity_suggester.get_activity_suggestion,
+                        key_args=self._normalize_weather_key(city, result, False),
+                        counter=_API_SEARCH, city=city, weather=result, is_forecast=False,
+                        lazy_kwargs={"precomputed_search": fut_search}
+                    ):
                         response += suggestion
-                        # Track search API call (happens inside activity_suggester)
-                        self.api_calls["search"] += 1
-                        self.api_calls["total"] += 1
-                        
-                        # Display token usage and cost information for activity suggestion
-                        if hasattr(self.llm, 'cost_tracker') and hasattr(self.llm.cost_tracker, 'last_call_info'):
-                            last_call = self.llm.cost_tracker.last_call_info
-                            input_tokens = last_call.get('input_tokens', 0)
-                            output_tokens = last_call.get('output_tokens', 0)
-                            cost = last_call.get('cost', 0)
-                            print(f"💰 LLM call: {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
+
+                        # Display token usage and cost information
+                        self._log_llm_cost()
             except Exception as e:
-                print(f"Error using weather tool: {e}")
+                logger.warning(f"Error using weather tool: {e}")
                 response = f"I'm sorry, I encountered an error getting weather for {city}."
         elif intent == "forecast":
             # Dynamic tool selection based on intent - forecast weather
             # Extract time reference from query - additional parameter extraction
-            time_reference = re.search(r'\b(tomorrow|next|upcoming|this weekend|next week|future)\b', query.lower())
-            time_phrase = time_reference.group(0) if time_reference else "the future"
+            # Reuse the time phrase already extracted for the cache key
+            time_phrase = time_qualifier or "the future"
             
-            print(f"→ User requested forecast for {city} for {time_phrase}")
+            logger.info(f"→ User requested forecast for {city} for {time_phrase}")
             
             # Determine number of days based on time phrase - reasoning about parameters
             if "weekend" in time_phrase:
-                # Calculate days until weekend (Saturday and Sunday)
-                from datetime import datetime, timedelta
-                today = datetime.now()
-                
-                # Find the next Saturday (weekday 5)
-                days_to_saturday = (5 - today.weekday()) % 7
-                if days_to_saturday == 0 and today.hour >= 18:  # If it's Saturday evening, get next weekend
-                    days_to_saturday = 7
-                
-                # Calculate the dates for Saturday and Sunday
-                next_saturday = today + timedelta(days=days_to_saturday)
-                next_sunday = next_saturday + timedelta(days=1)
-                
-                # Format dates for display
-                saturday_date = next_saturday.strftime('%Y-%m-%d')
-                sunday_date = next_sunday.strftime('%Y-%m-%d')
-                
-                print(f"→ Weekend dates: {saturday_date} (Sat) and {sunday_date} (Sun)")
-                
-                # Request enough days to include the weekend
-                forecast_days = days_to_saturday + 2  # Add 2 to include both Saturday and Sunday
+                # Calculate days until weekend (Saturday and Sunday) - memoized
+                # per day so repeated weekend queries skip the date math
+                now = datetime.now()
+                saturday_date, sunday_date, forecast_days = _compute_weekend_dates(
+                    now.date(), now.weekday() == 5 and now.hour >= 18
+                )
+
+                logger.info(f"→ Weekend dates: {saturday_date} (Sat) and {sunday_date} (Sun)")
             elif "week" in time_phrase:
                 forecast_days = 7
             elif "tomorrow" in time_phrase:
@@ -305,67 +804,78 @@ class WeatherAgent:
             # Get forecast - tool selection and execution
             forecast_tool = self.tool_registry.get_tool("get_weather_forecast")
             try:
-                print("🔧 Using tool: get_weather_forecast")
-                forecasts = forecast_tool.execute(city=city, days=forecast_days)
-                # Track API call
-                self.api_calls["forecast"] += 1
-                self.api_calls["total"] += 1
-                
+                logger.info("🔧 Using tool: get_weather_forecast")
+                # Overlap the forecast fetch with a speculative search
+                # prefetch for the city, as in the current-weather branch
+                fut_forecast = self._pool.submit(
+                    self._cached_tool_call, "get_weather_forecast",
+                    forecast_tool.execute, counter=_API_FORECAST, city=city, days=forecast_days
+                )
+                fut_search = self._pool.submit(self.brave.search, f"tourist attractions {city}")
+                forecasts = fut_forecast.result()
+
                 if not forecasts:
                     response = f"I'm sorry, I couldn't get the weather forecast for {city}."
                 else:
                     # Format the forecast response based on the time phrase - reasoning about response format
                     if "weekend" in time_phrase:
-                        # Weekend forecast - find the correct dates for Saturday and Sunday
-                        weekend_forecasts = []
-                        
+                        # Weekend forecast - index the days by date once so the
+                        # weekend lookups (and the neighbor fallbacks below)
+                        # are O(1) instead of rescanning the list
+                        by_date = {f['date']: (i, f) for i, f in enumerate(forecasts)}
+
                         # Debug the forecasts we received
-                        print(f"→ Received {len(forecasts)} days of forecast data:")
+                        logger.info(f"→ Received {len(forecasts)} days of forecast data:")
                         for i, f in enumerate(forecasts):
-                            print(f"  Day {i+1}: {f['date']}")
-                        
+                            logger.info(f"  Day {i+1}: {f['date']}")
+
                         # Find the forecasts for Saturday and Sunday by date
-                        for forecast in forecasts:
-                            if forecast['date'] == saturday_date:
-                                weekend_forecasts.append((forecast, "Saturday"))
-                            elif forecast['date'] == sunday_date:
-                                weekend_forecasts.append((forecast, "Sunday"))
-                        
+                        weekend_forecasts = []
+                        if saturday_date in by_date:
+                            weekend_forecasts.append((by_date[saturday_date][1], "Saturday"))
+                        if sunday_date in by_date:
+                            weekend_forecasts.append((by_date[sunday_date][1], "Sunday"))
+
                         # If we couldn't find the exact weekend dates, use the first two days
                         if len(weekend_forecasts) < 2:
-                            print("⚠️ Could not find exact weekend dates in forecast data, using available days")
+                            logger.warning("⚠️ Could not find exact weekend dates in forecast data, using available days")
                             if len(weekend_forecasts) == 0 and len(forecasts) >= 2:
                                 weekend_forecasts = [(forecasts[0], "Saturday"), (forecasts[1], "Sunday")]
                             elif len(weekend_forecasts) == 0 and len(forecasts) == 1:
                                 weekend_forecasts = [(forecasts[0], "Weekend")]
                             elif len(weekend_forecasts) == 1 and len(forecasts) >= 2:
-                                # We have one weekend day, add the next day as the other weekend day
-                                if weekend_forecasts[0][1] == "Saturday" and len(forecasts) > 1:
-                                    for i, f in enumerate(forecasts):
-                                        if f['date'] == weekend_forecasts[0][0]['date'] and i+1 < len(forecasts):
-                                            weekend_forecasts.append((forecasts[i+1], "Sunday"))
-                                            break
-                                elif weekend_forecasts[0][1] == "Sunday":
-                                    for i, f in enumerate(forecasts):
-                                        if f['date'] == weekend_forecasts[0][0]['date'] and i > 0:
-                                            weekend_forecasts.insert(0, (forecasts[i-1], "Saturday"))
-                                            break
+                                # We have one weekend day; its index locates the neighbor day
+                                idx = by_date[weekend_forecasts[0][0]['date']][0]
+                                if weekend_forecasts[0][1] == "Saturday" and idx + 1 < len(forecasts):
+                                    weekend_forecasts.append((forecasts[idx + 1], "Sunday"))
+                                elif weekend_forecasts[0][1] == "Sunday" and idx > 0:
+                                    weekend_forecasts.insert(0, (forecasts[idx - 1], "Saturday"))
                         
-                        response = f"Weather forecast for {city} this weekend:\n\n"
-                        for forecast, day_label in weekend_forecasts:
-                            response += f"• {forecast['date']} ({day_label}): {forecast['min_temp']}°C to {forecast['max_temp']}°C, {forecast['conditions']}\n"
+                        # Build with join instead of += so k days cost O(k)
+                        # string allocation rather than O(k^2)
+                        parts = [f"Weather forecast for {city} this weekend:\n\n"]
+                        parts.extend(
+                            f"• {forecast['date']} ({day_label}): {forecast['min_temp']}°C to {forecast['max_temp']}°C, {forecast['conditions']}\n"
+                            for forecast, day_label in weekend_forecasts
+                        )
+                        response = "".join(parts)
                     elif "tomorrow" in time_phrase:
                         # Tomorrow's forecast
                         tomorrow = forecasts[0]
-                        response = f"Weather forecast for {city} tomorrow ({tomorrow['date']}):\n"
-                        response += f"Temperature: {tomorrow['min_temp']}°C to {tomorrow['max_temp']}°C\n"
-                        response += f"Conditions: {tomorrow['conditions']}\n"
-                        response += f"Humidity: {tomorrow['humidity']}%"
+                        response = (
+                            f"Weather forecast for {city} tomorrow ({tomorrow['date']}):\n"
+                            f"Temperature: {tomorrow['min_temp']}°C to {tomorrow['max_temp']}°C\n"
+                            f"Conditions: {tomorrow['conditions']}\n"
+                            f"Humidity: {tomorrow['humidity']}%"
+                        )
                     else:
                         # Multi-day forecast
-                        response = f"Weather forecast for {city} for the next {len(forecasts)} days:\n\n"
-                        for day in forecasts:
-                            response += f"• {day['date']}: {day['min_temp']}°C to {day['max_temp']}°C, {day['conditions']}\n"
+                        parts = [f"Weather forecast for {city} for the next {len(forecasts)} days:\n\n"]
+                        parts.extend(
+                            f"• {day['date']}: {day['min_temp']}°C to {day['max_temp']}°C, {day['conditions']}\n"
+                            for day in forecasts
+                        )
+                        response = "".join(parts)
                     
                     # Tool chaining - using activity suggester based on forecast data
                     if forecasts:
@@ -374,177 +884,182 @@ class WeatherAgent:
                             'temp': (first_day['min_temp'] + first_day['max_temp']) / 2,  # Average temp
                             'conditions': first_day['conditions']
                         }
-                        print("🔧 Using tool: get_activity_suggestion")
-                        if suggestion := self.activity_suggester.get_activity_suggestion(city, weather_data, is_forecast=True):
+                        logger.info("🔧 Using tool: get_activity_suggestion")
+                        if suggestion := self._cached_tool_call(
+                            "get_activity_suggestion", self.activity_suggester.get_activity_suggestion,
+                            key_args=self._normalize_weather_key(city, weather_data, True),
+                            counter=_API_SEARCH, city=city, weather=weather_data, is_forecast=True,
+                            lazy_kwargs={"precomputed_search": fut_search}
+                        ):
                             response += f"\n{suggestion}"
-                            # Track search API call (happens inside activity_suggester)
-                            self.api_calls["search"] += 1
-                            self.api_calls["total"] += 1
-                            
-                            # Display token usage and cost information for activity suggestion
-                            if hasattr(self.llm, 'cost_tracker') and hasattr(self.llm.cost_tracker, 'last_call_info'):
-                                last_call = self.llm.cost_tracker.last_call_info
-                                input_tokens = last_call.get('input_tokens', 0)
-                                output_tokens = last_call.get('output_tokens', 0)
-                                cost = last_call.get('cost', 0)
-                                print(f"💰 LLM call: {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
+
+                            # Display token usage and cost information
+                            self._log_llm_cost()
             except Exception as e:
-                print(f"Error using forecast tool: {e}")
+                logger.warning(f"Error using forecast tool: {e}")
                 response = f"I'm sorry, I encountered an error getting the forecast for {city}."
         elif intent == "history":
-            print("→ Historical weather functionality is not implemented yet")
+            logger.info("→ Historical weather functionality is not implemented yet")
             response = f"I'm sorry, I don't have access to historical weather data for {city} yet."
         else:
             response = "I can help with current weather information. Please specify a location."
         
-        print("\nStep 4: Saving this interaction to the database")
-        # 4. Logging to SQLite
-        with self.db:
-            self.db.execute('''
-                INSERT INTO interactions (query, response)
-                VALUES (?, ?)
-            ''', (query, response))
-        print("→ Interaction saved")
-        print("-----------------------------------")
-        
+        # Cache successful answers for repeats within the same time bucket
+        # (error responses all start with "I'm sorry" and are not cached)
+        if intent in ("current", "forecast") and not response.startswith("I'm sorry"):
+            self._response_cache[response_key] = response
+            while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                self._response_cache.popitem(last=False)
+
+        # 4. Logging and summaries happen off the critical path - the response
+        # goes back to the user while the background worker persists the
+        # interaction and prints the session summaries
+        logger.info("\nStep 4: Saving this interaction to the database")
+        self._bg.submit(self._persist_and_summarize, query, response)
+
+        return response
+
+    def _persist_and_summarize(self, query, response):
+        """Persist an interaction and print the session summaries
+
+        Runs on the background worker so the user-visible response isn't
+        blocked on the SQLite write or the summary printing.
+        """
+        # Logging to SQLite - handed to the batching writer thread
+        self._log_queue.put((query, response))
+        logger.info("→ Interaction saved")
+        logger.info("-----------------------------------")
+
         # Display session summary after each query
-        print("\nCurrent Session Summary:")
+        logger.info("\nCurrent Session Summary:")
         self.llm.cost_tracker.print_session_summary()
-        
+
         # Display API call summary
-        print("\nAPI Call Summary:")
-        print(f"→ Weather API calls: {self.api_calls['weather']}")
-        print(f"→ Forecast API calls: {self.api_calls['forecast']}")
-        print(f"→ Search API calls: {self.api_calls['search']}")
-        print(f"→ Total API calls: {self.api_calls['total'] + self.llm.cost_tracker.get_session_summary()['total_calls']}")
-        
-        return response
+        logger.info("\nAPI Call Summary:")
+        api_calls = self.api_calls
+        logger.info(f"→ Weather API calls: {api_calls['weather']}")
+        logger.info(f"→ Forecast API calls: {api_calls['forecast']}")
+        logger.info(f"→ Search API calls: {api_calls['search']}")
+        logger.info(f"→ Total API calls: {api_calls['total'] + self.llm.cost_tracker.get_session_summary()['total_calls']}")
     
     # ===== INTENT DETECTION =====
     # Simple rule-based intent detection - part of the reasoning layer
     def _detect_intent(self, query):
-        # Simple rule-based approach for maximum transparency
-        query = query.lower()
-        if re.search(r'\b(current|now|today)\b', query):
-            return "current"
-        if re.search(r'\b(history|last week|past)\b', query):
-            return "history"
-        if re.search(r'\b(forecast|tomorrow|next|upcoming|this weekend|next week|future)\b', query):
-            return "forecast"
-        
+        # Simple rule-based approach for maximum transparency. One fused scan
+        # collects every intent keyword in the query, then the original
+        # priority order (current > history > forecast) picks the winner.
+        matched = {m.lastgroup for m in _INTENT_RE.finditer(query)}
+        for intent in ("current", "history", "forecast"):
+            if intent in matched:
+                return intent
+
         # Default to current for simplicity - most weather queries are about current weather
-        print("No specific time reference found, defaulting to current weather")
+        logger.info("No specific time reference found, defaulting to current weather")
         return "current"
     
     # ===== ENTITY EXTRACTION =====
     # City extraction with LLM verification - part of the reasoning layer
     def _extract_city(self, query):
         """Extract city name from query with better accuracy"""
-        # First try pattern matching
-        patterns = [
-            r'\b(?:in|at|for|near|around)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*?)(?:\s+(?:weather|temperature|forecast))',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),\s*[A-Z]{2}\b'
-        ]
-        
+        # First try pattern matching with the pre-compiled patterns
         candidate_city = None
-        for pattern in patterns:
-            if match := re.search(pattern, query, re.I):
+        for pattern in _CITY_PATTERNS:
+            if match := pattern.search(query):
                 candidate_city = ' '.join(word.capitalize() for word in match.group(1).split())
                 break
+
+        # Well-known city names skip verification entirely - a set lookup
+        # against the local index instead of an LLM roundtrip
+        if candidate_city and is_known_city(candidate_city):
+            logger.info(f"✓ Verified city (local index): {candidate_city}")
+            return candidate_city
+
+        # Check the verification cache before paying for an LLM call -
+        # repeated queries about the same city hit this path
+        cache_key = (candidate_city or query).lower().strip()
+        if cached_city := self._city_cache_get(cache_key):
+            logger.info(f"✓ Verified city (cached): {cached_city}")
+            return cached_city
+
+        # Verify with LLM - using LLM for entity verification
+        logger.info("\n🤔 Thinking: Verifying if this is a valid city name...")
+        logger.info("🧠 Using language model API for city verification")
+        verify_prompt = _VERIFY_PROMPT_TEMPLATE % (candidate_city or query)
         
-        # Always verify with LLM - using LLM for entity verification
-        print("\n🤔 Thinking: Verifying if this is a valid city name...")
-        print("🧠 Using language model API for city verification")
-        verify_prompt = (
-            f"Analyze the location '{candidate_city or query}' and provide information in the following JSON format:\n"
-            "{\n"
-            '  "is_valid": true/false,\n'
-            '  "city": "Correct city name with proper capitalization",\n'
-            '  "country": "Primary country where this city is located",\n'
-            '  "alternates": ["Country1", "Country2"],  // If same city name exists in multiple countries\n'
-            '  "confidence": 0.0-1.0,  // How confident in this identification\n'
-            '  "disambiguation": "Additional context if needed"\n'
-            "}\n\n"
-            "Example response:\n"
-            "{\n"
-            '  "is_valid": true,\n'
-            '  "city": "Cambridge",\n'
-            '  "country": "United Kingdom",\n'
-            '  "alternates": ["United States"],\n'
-            '  "confidence": 0.9,\n'
-            '  "disambiguation": "Major cities named Cambridge exist in both the UK and USA (Massachusetts)"\n'
-            "}\n\n"
-            "Provide only the JSON response, no additional text."
-        )
-        
+        # Stream the verification reply so we stop reading (and the provider
+        # stops billing) as soon as the JSON object is complete
         response = self.llm.generate(
             prompt=verify_prompt,
-            operation="verify_city"
+            operation="verify_city",
+            stream=True
         )
         
         # Display token usage and cost information
-        if hasattr(self.llm, 'cost_tracker') and hasattr(self.llm.cost_tracker, 'last_call_info'):
-            last_call = self.llm.cost_tracker.last_call_info
-            input_tokens = last_call.get('input_tokens', 0)
-            output_tokens = last_call.get('output_tokens', 0)
-            cost = last_call.get('cost', 0)
-            print(f"💰 LLM call: {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
+        self._log_llm_cost()
         
         if response and 'choices' in response:
             try:
-                result = json.loads(response['choices'][0]['message']['content'].strip())
-                
+                result = _decode_city_result(response['choices'][0]['message']['content'].strip())
+
                 # Handle valid city with high confidence
-                if result.get('is_valid') and result.get('confidence', 0) > 0.7:
-                    city_name = result['city']
-                    
+                if result.is_valid and result.confidence > 0.7:
+                    city_name = result.city
+
                     # Print geographic context
-                    print(f"✓ Verified city: {city_name}, {result['country']}")
-                    if result.get('alternates'):
-                        print(f"  Note: Also exists in {', '.join(result['alternates'])}")
-                    if result.get('disambiguation'):
-                        print(f"  Context: {result['disambiguation']}")
-                    
+                    logger.info(f"✓ Verified city: {city_name}, {result.country}")
+                    if result.alternates:
+                        logger.info(f"  Note: Also exists in {', '.join(result.alternates)}")
+                    if result.disambiguation:
+                        logger.info(f"  Context: {result.disambiguation}")
+
+                    self._city_cache_put(cache_key, city_name, result.country)
+                    remember_city(city_name)
                     return city_name
-                
+
                 # Handle ambiguous cases
-                elif result.get('is_valid') and result.get('alternates'):
-                    print(f"⚠️  Ambiguous city name: {result['city']}")
-                    print(f"  Found in: {result['country']} and {', '.join(result['alternates'])}")
+                elif result.is_valid and result.alternates:
+                    logger.warning(f"⚠️  Ambiguous city name: {result.city}")
+                    logger.info(f"  Found in: {result.country} and {', '.join(result.alternates)}")
                     # For now, return the primary country's city
                     # TODO: Could be enhanced to ask user for clarification
-                    return result['city']
-                
+                    self._city_cache_put(cache_key, result.city, result.country)
+                    remember_city(result.city)
+                    return result.city
+
                 # Handle invalid cities
                 else:
-                    print("❌ Invalid or unknown city name")
-                    if result.get('disambiguation'):
-                        print(f"  Note: {result['disambiguation']}")
+                    logger.warning("❌ Invalid or unknown city name")
+                    if result.disambiguation:
+                        logger.info(f"  Note: {result.disambiguation}")
                     return None
                     
-            except json.JSONDecodeError:
-                print("❌ Could not parse city validation response")
+            except ValueError:  # covers both json and orjson decode errors
+                logger.warning("❌ Could not parse city validation response")
                 return None
         
-        print("❌ Could not verify city name")
+        logger.warning("❌ Could not verify city name")
         return None
 
 # ===== MAIN EXECUTION =====
 if __name__ == "__main__":
     import sys
-    
+
+    # Interactive CLI keeps the per-query play-by-play by default; batch
+    # runs can silence it (and the stdout lock) with LOG_LEVEL=WARNING
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+
     # Show available models if requested
     if "--list-models" in sys.argv:
         WeatherAgent(llm_model="list")
         sys.exit(0)
     
-    # Show available tools if requested
+    # Show available tools if requested - metadata-only registry, so no
+    # LLM client or provider construction just to print the catalog
     if "--list-tools" in sys.argv:
-        agent = WeatherAgent()
+        registry = WeatherAgentToolRegistry(metadata_only=True)
         print("\nAvailable Tools:")
         print("===============")
-        for tool in agent.tool_registry.list_tools():
+        for tool in registry.list_tools():
             print(f"\n→ {tool['name']}")
             print(f"  Description: {tool['description']}")
             print(f"  Category: {tool['category']}")
@@ -13,6 +13,14 @@ It tests various aspects including:
 import json
 import time
 import logging
+
+try:
+    import orjson  # 3-10x faster (de)serialization for test cases and reports
+except ImportError:
+    orjson = None
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -47,18 +55,32 @@ class TestCase:
 
 class WeatherAgentEvaluator:
     """Evaluates the Weather Agent's performance and accuracy"""
-    
+
+    # Scoring patterns, compiled once at class load instead of per response
+    _ATTRACTION_RE = re.compile(r"🎯 Suggested Activity: Visit ([^(]+)(?:\s+\(([^)]+)\))?")
+    _SPECIFIC_RE = re.compile(r"^[A-Z][a-z']+(?: [A-Z][a-z']+)*$")
+    _TEMP_RE = re.compile(r"\d+\.?\d*°C")
+    _COND_RE = re.compile(r"(clear|cloudy|rain|snow|storm|overcast)", re.I)
+    # Single alternation instead of an 11-term substring loop
+    _WEATHER_TERMS_RE = re.compile(
+        r"weather|temperature|indoor|outdoor|hot|cold|rain|snow|sunny|warm|cool", re.I
+    )
+
     def __init__(self, test_cases_path: str = "agent_eval/test_cases.json"):
         self.test_cases = self._load_test_cases(test_cases_path)
         self.metrics = EvaluationMetrics()
         self.results: List[Dict] = []
+        # Issue tallies maintained incrementally as results arrive, so the
+        # recommendation step reads counters instead of rescanning results
+        self._rec_counters = Counter()
     
     def _load_test_cases(self, path: str) -> List[TestCase]:
         """Load test cases from JSON file"""
         try:
-            with open(path) as f:
-                data = json.load(f)
-                return [TestCase(**case) for case in data["test_cases"]]
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
+            return [TestCase(**case) for case in data["test_cases"]]
         except Exception as e:
             logger.error(f"Failed to load test cases: {e}")
             return []
@@ -75,7 +97,7 @@ class WeatherAgentEvaluator:
         reasons = []
         
         # Extract the attraction name and weather note
-        attraction_match = re.search(r"🎯 Suggested Activity: Visit ([^(]+)(?:\s+\(([^)]+)\))?", suggestion)
+        attraction_match = self._ATTRACTION_RE.search(suggestion)
         if not attraction_match:
             return 0.1, ["Suggestion format incorrect"]
         
@@ -91,7 +113,7 @@ class WeatherAgentEvaluator:
                     break
             else:
                 # Check if it's a specific attraction (not generic)
-                if re.match(r"^[A-Z][a-z']+(?: [A-Z][a-z']+)*$", attraction):
+                if self._SPECIFIC_RE.match(attraction):
                     score += 0.2
                     reasons.append("Specific attraction name (though not in known list)")
                 else:
@@ -106,8 +128,7 @@ class WeatherAgentEvaluator:
                     break
             else:
                 # Check if note is contextual to weather
-                weather_terms = ["weather", "temperature", "indoor", "outdoor", "hot", "cold", "rain", "snow", "sunny", "warm", "cool"]
-                if any(term in weather_note.lower() for term in weather_terms):
+                if self._WEATHER_TERMS_RE.search(weather_note):
                     score += 0.2
                     reasons.append("Weather-contextual note (though not matching expected terms)")
         
@@ -138,12 +159,12 @@ class WeatherAgentEvaluator:
         reasons = []
         
         # Check for temperature
-        if re.search(r"\d+\.?\d*°C", response):
+        if self._TEMP_RE.search(response):
             score += 0.4
             reasons.append("Contains temperature")
         
         # Check for weather conditions
-        if re.search(r"(clear|cloudy|rain|snow|storm|overcast)", response.lower()):
+        if self._COND_RE.search(response):
             score += 0.3
             reasons.append("Contains weather conditions")
         
@@ -154,52 +175,75 @@ class WeatherAgentEvaluator:
         
         return min(1.0, score), reasons
     
-    def run_evaluation(self, agent) -> Dict:
-        """Run the full evaluation suite"""
+    def _eval_one(self, agent, case: TestCase) -> Tuple[Dict, bool]:
+        """Evaluate a single test case (runs on a worker thread)"""
+        # Time the response
+        query_start = time.time()
+        response = agent.process_query(case.query)
+        query_time = time.time() - query_start
+
+        # Evaluate response
+        weather_score, weather_reasons = self.evaluate_weather_response(response, case.expected)
+        suggestion_score, suggestion_reasons = self.evaluate_suggestion(response, case.expected)
+
+        success = (query_time <= case.max_response_time
+                   and (weather_score + suggestion_score) / 2 >= 0.7)
+
+        return {
+            "query": case.query,
+            "response": response,
+            "response_time": query_time,
+            "weather_score": weather_score,
+            "suggestion_score": suggestion_score,
+            "weather_reasons": weather_reasons,
+            "suggestion_reasons": suggestion_reasons
+        }, success
+
+    def run_evaluation(self, agent, max_workers: int = 8) -> Dict:
+        """Run the full evaluation suite
+
+        Test cases are independent, so they are dispatched concurrently and
+        wall time approaches the slowest case instead of the sum of all the
+        network round-trips. Metrics and results are aggregated on this
+        thread as the futures complete.
+        """
         start_time = time.time()
-        
-        for case in self.test_cases:
-            self.metrics.total_queries += 1
-            try:
-                # Time the response
-                query_start = time.time()
-                response = agent.process_query(case.query)
-                query_time = time.time() - query_start
-                
-                # Evaluate response
-                weather_score, weather_reasons = self.evaluate_weather_response(response, case.expected)
-                suggestion_score, suggestion_reasons = self.evaluate_suggestion(response, case.expected)
-                
-                # Track metrics
-                if query_time <= case.max_response_time and (weather_score + suggestion_score) / 2 >= 0.7:
+        suggestion_score_total = 0.0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._eval_one, agent, case): case
+                       for case in self.test_cases}
+            for future in as_completed(futures):
+                case = futures[future]
+                self.metrics.total_queries += 1
+                try:
+                    result, success = future.result()
+                except Exception as e:
+                    logger.error(f"Error evaluating case {case.query}: {e}")
+                    self.metrics.failed_queries += 1
+                    error_result = {
+                        "query": case.query,
+                        "error": str(e)
+                    }
+                    self.results.append(error_result)
+                    self._update_rec_counters(error_result)
+                    continue
+
+                if success:
                     self.metrics.successful_queries += 1
                 else:
                     self.metrics.failed_queries += 1
-                
-                self.results.append({
-                    "query": case.query,
-                    "response": response,
-                    "response_time": query_time,
-                    "weather_score": weather_score,
-                    "suggestion_score": suggestion_score,
-                    "weather_reasons": weather_reasons,
-                    "suggestion_reasons": suggestion_reasons
-                })
-                
-            except Exception as e:
-                logger.error(f"Error evaluating case {case.query}: {e}")
-                self.metrics.failed_queries += 1
-                self.results.append({
-                    "query": case.query,
-                    "error": str(e)
-                })
-        
-        # Calculate final metrics
+                self.results.append(result)
+                self._update_rec_counters(result)
+                suggestion_score_total += result["suggestion_score"]
+
+        # Calculate final metrics - everything per-result was accumulated in
+        # the collection loop, so no second walk over the results is needed
         total_time = time.time() - start_time
         self.metrics.avg_response_time = total_time / len(self.test_cases)
         self.metrics.error_rate = self.metrics.failed_queries / self.metrics.total_queries
-        self.metrics.suggestion_quality_score = sum(r.get("suggestion_score", 0) for r in self.results) / len(self.results)
-        
+        self.metrics.suggestion_quality_score = suggestion_score_total / len(self.results)
+
         return self.generate_report()
     
     def generate_report(self) -> Dict:
@@ -219,77 +263,103 @@ class WeatherAgentEvaluator:
         # Save report to file
         report_path = Path("agent_eval/latest_report.json")
         report_path.parent.mkdir(exist_ok=True)
-        with open(report_path, "w") as f:
-            json.dump(report, f, indent=2)
-        
+        if orjson:
+            report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(report_path, "w") as f:
+                json.dump(report, f, indent=2)
+
         return report
     
+    def _update_rec_counters(self, result: Dict) -> None:
+        """Tally the issues a single result exhibits (called once per result,
+        so _generate_recommendations never rescans the result list)"""
+        if result.get("response_time", 0) > 3.0:
+            self._rec_counters["slow"] += 1
+        if result.get("suggestion_score", 0) < 0.7:
+            self._rec_counters["low_quality"] += 1
+        reasons = result.get("suggestion_reasons", [])
+        if "Generic or unknown attraction" in reasons:
+            self._rec_counters["generic"] += 1
+        if not any("weather" in reason for reason in reasons):
+            self._rec_counters["no_weather_context"] += 1
+        if any("format incorrect" in reason for reason in reasons):
+            self._rec_counters["format_incorrect"] += 1
+        if "no results" in str(result.get("error", "")).lower():
+            self._rec_counters["no_results"] += 1
+
     def _generate_recommendations(self) -> List[str]:
-        """Generate improvement recommendations based on evaluation results"""
+        """Generate improvement recommendations from the issue counters"""
         recommendations = []
-        
+        counters = self._rec_counters
+
         # Response time recommendations
-        slow_responses = [r for r in self.results if r.get("response_time", 0) > 3.0]
-        if slow_responses:
+        if counters["slow"]:
             recommendations.append(
-                f"Consider optimizing response time for {len(slow_responses)} queries "
+                f"Consider optimizing response time for {counters['slow']} queries "
                 "that took longer than 3 seconds. Consider caching search results or "
                 "reducing LLM token usage."
             )
-        
+
         # Quality recommendations
-        low_quality = [r for r in self.results if r.get("suggestion_score", 0) < 0.7]
-        if low_quality:
+        if counters["low_quality"]:
             recommendations.append(
-                f"Improve suggestion quality for {len(low_quality)} responses "
+                f"Improve suggestion quality for {counters['low_quality']} responses "
                 "that scored below 70%. Review the LLM prompt in ActivitySuggester "
                 "to ensure it extracts specific attractions."
             )
-            
+
             # Analyze specific issues
-            generic_issues = sum(1 for r in self.results if "Generic or unknown attraction" in r.get("suggestion_reasons", []))
-            if generic_issues > 0:
+            if counters["generic"]:
                 recommendations.append(
-                    f"Found {generic_issues} generic attraction suggestions. "
+                    f"Found {counters['generic']} generic attraction suggestions. "
                     "Enhance the LLM prompt with more examples of specific attractions."
                 )
-                
-            weather_issues = sum(1 for r in self.results if not any("weather" in reason for reason in r.get("suggestion_reasons", [])))
-            if weather_issues > 0:
+
+            if counters["no_weather_context"]:
                 recommendations.append(
-                    f"Found {weather_issues} suggestions without proper weather context. "
+                    f"Found {counters['no_weather_context']} suggestions without proper weather context. "
                     "Improve weather-specific reasoning in the LLM prompt."
                 )
-        
+
         # Error handling recommendations
         if self.metrics.error_rate > 0.1:
             recommendations.append(
                 "High error rate detected. Add better error handling in ActivitySuggester "
                 "for LLM parsing failures and search result processing."
             )
-            
+
         # LLM-specific recommendations
-        if any("format incorrect" in r.get("suggestion_reasons", []) for r in self.results):
+        if counters["format_incorrect"]:
             recommendations.append(
                 "LLM response format issues detected. Add stricter JSON validation and "
                 "fallback mechanisms when parsing fails."
             )
-            
+
         # Search quality recommendations
-        if any("no results" in str(r.get("error", "")).lower() for r in self.results):
+        if counters["no_results"]:
             recommendations.append(
                 "Search failures detected. Consider adding fallback search queries "
                 "and a cache of known attractions for popular cities."
             )
-        
+
         return recommendations
 
 if __name__ == "__main__":
     # Example usage
+    import os
     from agent import WeatherAgent
-    
+
+    # Silence the agent's per-query progress logging during evaluation runs
+    # (hundreds of queries otherwise fight over the stdout lock)
+    for name in ("agent", "tools.brave_search"):
+        logging.getLogger(name).setLevel(os.getenv("LOG_LEVEL", "WARNING"))
+
     evaluator = WeatherAgentEvaluator()
+    # One agent (one LLM client, HTTP session and DB handle) serves every
+    # worker; warm its connections before the concurrent burst starts
     agent = WeatherAgent()
+    agent.warmup()
     report = evaluator.run_evaluation(agent)
     
     print("\nEvaluation Report Summary:")
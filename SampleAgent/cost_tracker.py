@@ -1,19 +1,88 @@
-import tiktoken
+import os
+import sys
+import time
+import functools
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
 from typing import Dict, Optional
 from datetime import datetime
 
+# Persist tiktoken's downloaded merge tables next to the project so new
+# processes load them from disk instead of the network
+os.environ.setdefault(
+    "TIKTOKEN_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), ".tiktoken_cache")
+)
+
+
+@functools.lru_cache(maxsize=8)
+def get_encoding(name: str):
+    """Share one tiktoken Encoding per name across all clients and trackers
+
+    Construction reads merge tables and compiles the BPE regex; paying that
+    once per process instead of once per instance matters when clients are
+    created per request. tiktoken itself is imported here rather than at
+    module top - it pulls in regex machinery that short-lived CLI runs
+    shouldn't pay for unless they actually tokenize.
+    """
+    import tiktoken
+    return tiktoken.get_encoding(name)
+
+@dataclass(slots=True)
+class CallInfo:
+    """One logged LLM call - slotted so a 10K-call session stays compact
+    (contiguous slot storage, no per-instance __dict__)"""
+    t_ns: int
+    operation: str
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    cost: float
+
+
 class CostTracker:
     """Tracks token usage and costs for LLM operations"""
-    
-    def __init__(self, model_name: str, encoding_name: str = "cl100k_base"):
-        self.model_name = model_name
-        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    # Token-count cache bounds: agent prompts share big static prefixes and
+    # repeat verbatim, so counts are memoized - but only for strings under
+    # the length cap and up to a fixed number of entries, keeping memory flat
+    _COUNT_CACHE_MAX_LEN: int = 8192
+    _COUNT_CACHE_MAX_ENTRIES: int = 1024
+
+    def __init__(self, model_name: str, encoding_name: str = "cl100k_base") -> None:
+        # Fully annotated so the arithmetic path can be compiled (mypyc/
+        # Cython unbox typed int/float attributes); the repo ships no build
+        # system, so compilation stays an opt-in downstream step
+        self.model_name: str = model_name
+        self.encoding = get_encoding(encoding_name)
         self.session_start = datetime.now()
-        self.calls = []
-        self.total_tokens = {"input": 0, "output": 0}
-        self.total_cost = 0.0
+        # Monotonic base for per-call timestamps: one cheap clock read per
+        # call and no datetime object pinned per entry; wall-clock display
+        # is reconstructed lazily from these bases when printing
+        self._session_start_wall: float = time.time()
+        self._session_start_ns: int = time.monotonic_ns()
+        # Bounded history: long-running agents would otherwise grow this
+        # list forever. Aggregate totals survive eviction of old entries.
+        self.calls = deque(maxlen=int(os.getenv('COST_TRACKER_MAX_CALLS', 10000)))
+        self._in_tok: int = 0
+        self._out_tok: int = 0
+        self.call_count: int = 0  # monotone - unlike len(calls), survives eviction
+        self.total_cost: float = 0.0
         self.last_call_info = None  # Store the most recent call info
-        self.operation_stats = {}   # Track stats by operation type
+        # Stats by operation type; defaultdict so the hot path does a single
+        # lookup instead of a membership test plus four subscripts
+        self.operation_stats = defaultdict(lambda: {
+            "count": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cost": 0.0,
+            "cache_hits": 0
+        })
+        self._count_cache = OrderedDict()  # text -> token count (LRU)
+        # Raw texts are only retained when re-pricing support is requested -
+        # they can dwarf the rest of the tracker's memory otherwise
+        self._keep_texts = os.getenv('COST_TRACKER_KEEP_PROMPTS', '0') == '1'
+        self._texts: list = []
         
         # Cost per 1K tokens (in USD)
         self.COST_PER_1K = {
@@ -21,93 +90,202 @@ class CostTracker:
             "meta-llama/Llama-2-70b-chat": {"input": 0.0009, "output": 0.0009},
             "deepseek/deepseek-r1:free": {"input": 0.0005, "output": 0.0005}  # Estimated cost, adjust as needed
         }
+
+        # Per-token cost resolved once - model_name is fixed for a tracker,
+        # so log_call does two multiplies instead of dict lookups + division
+        model_cost = self.COST_PER_1K.get(model_name, {"input": 0.001, "output": 0.001})
+        self._cost_in_per_tok: float = model_cost["input"] / 1000.0
+        self._cost_out_per_tok: float = model_cost["output"] / 1000.0
     
-    def log_call(self, operation: str, prompt: str, response: str) -> Dict:
-        """Log a single LLM call and return usage stats"""
-        input_tokens = len(self.encoding.encode(prompt))
-        output_tokens = len(self.encoding.encode(response))
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens with LRU memoization (large strings bypass the cache)"""
+        if len(text) >= self._COUNT_CACHE_MAX_LEN:
+            return len(self.encoding.encode(text))
+        if (count := self._count_cache.get(text)) is not None:
+            self._count_cache.move_to_end(text)
+            return count
+        count = len(self.encoding.encode(text))
+        self._store_count(text, count)
+        return count
+
+    def _store_count(self, text: str, count: int) -> None:
+        if len(text) >= self._COUNT_CACHE_MAX_LEN:
+            return
+        self._count_cache[text] = count
+        while len(self._count_cache) > self._COUNT_CACHE_MAX_ENTRIES:
+            self._count_cache.popitem(last=False)
+
+    def clear_count_cache(self) -> None:
+        """Drop all memoized token counts"""
+        self._count_cache.clear()
+
+    def _count_pair(self, prompt: str, response: str) -> "tuple[int, int]":
+        """Tokenize prompt and response, via the memo cache when either is
+        already known, otherwise in one batched tiktoken call"""
+        if prompt in self._count_cache or response in self._count_cache:
+            return self._count_tokens(prompt), self._count_tokens(response)
+        encoded = self.encoding.encode_batch([prompt, response], num_threads=2)
+        counts = (len(encoded[0]), len(encoded[1]))
+        self._store_count(prompt, counts[0])
+        self._store_count(response, counts[1])
+        return counts
+
+    def log_call(self, operation: str, prompt: str, response: str,
+                 input_tokens: Optional[int] = None,
+                 output_tokens: Optional[int] = None,
+                 cached_tokens: int = 0,
+                 model_name: Optional[str] = None) -> CallInfo:
+        """Log a single LLM call and return usage stats
+
+        Callers that already know the token counts (the client counts the
+        prompt up front, and providers return authoritative usage numbers)
+        pass them in; only whatever is missing gets tokenized here.
+        model_name overrides the pricing model for this call - that's what
+        lets one tracker be shared across clients for different models.
+        """
+        if input_tokens is None and output_tokens is None:
+            # One batched call into tiktoken instead of two - halves the FFI
+            # crossings and lets the two pretokenizations run in parallel
+            input_tokens, output_tokens = self._count_pair(prompt, response)
+        elif input_tokens is None:
+            input_tokens = self._count_tokens(prompt)
+        elif output_tokens is None:
+            output_tokens = self._count_tokens(response)
         
-        # Calculate cost
-        model_cost = self.COST_PER_1K.get(self.model_name, {"input": 0.001, "output": 0.001})
-        cost = ((input_tokens * model_cost["input"] + 
-                output_tokens * model_cost["output"]) / 1000)
+        # Calculate cost from the pre-resolved per-token rates; a per-call
+        # model override looks its rates up instead
+        if model_name is None or model_name == self.model_name:
+            cost: float = (input_tokens * self._cost_in_per_tok
+                           + output_tokens * self._cost_out_per_tok)
+        else:
+            rates = self.COST_PER_1K.get(model_name, {"input": 0.001, "output": 0.001})
+            cost = (input_tokens * rates["input"]
+                    + output_tokens * rates["output"]) / 1000.0
         
-        # Update totals
-        self.total_tokens["input"] += input_tokens
-        self.total_tokens["output"] += output_tokens
+        # Update totals (plain int attributes - cheaper than dict slots)
+        self._in_tok += input_tokens
+        self._out_tok += output_tokens
         self.total_cost += cost
         
-        # Update operation-specific stats
-        if operation not in self.operation_stats:
-            self.operation_stats[operation] = {
-                "count": 0,
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "cost": 0.0
-            }
-        
-        self.operation_stats[operation]["count"] += 1
-        self.operation_stats[operation]["input_tokens"] += input_tokens
-        self.operation_stats[operation]["output_tokens"] += output_tokens
-        self.operation_stats[operation]["cost"] += cost
+        # Update operation-specific stats through one local binding
+        stats = self.operation_stats[operation]
+        stats["count"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["cost"] += cost
         
         # Store call details
-        call_info = {
-            "timestamp": datetime.now(),
-            "operation": operation,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "cost": cost
-        }
+        call_info = CallInfo(
+            t_ns=time.monotonic_ns(),
+            operation=operation,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=cached_tokens,  # provider-reported cache hits
+            cost=cost
+        )
         self.calls.append(call_info)
+        self.call_count += 1
         self.last_call_info = call_info  # Store the most recent call
+        if self._keep_texts:
+            self._texts.append((prompt, response))
         
         return call_info
     
-    def print_call_stats(self, call_info: Dict):
-        """Print statistics for a single call"""
-        print("\nLLM Usage Stats:")
-        print(f"→ Operation: {call_info['operation']}")
-        print(f"→ Model: {self.model_name}")
-        print(f"→ Input tokens: {call_info['input_tokens']}")
-        print(f"→ Output tokens: {call_info['output_tokens']}")
-        print(f"→ Cost: ${call_info['cost']:.6f}")
-        print(f"→ Session total: ${self.total_cost:.6f}\n")
+    def recompute_costs(self, new_cost_per_1k: Dict) -> float:
+        """Re-price the session's retained texts under a different rate card
+
+        Requires COST_TRACKER_KEEP_PROMPTS=1 (texts aren't retained by
+        default). All texts are re-tokenized in a single encode_batch call so
+        tiktoken can parallelize across threads instead of paying one FFI
+        crossing per string. Returns the recomputed session total in USD.
+        """
+        if not self._texts:
+            raise ValueError(
+                "No retained texts to re-price; run with COST_TRACKER_KEEP_PROMPTS=1"
+            )
+        in_rate = new_cost_per_1k["input"] / 1000.0
+        out_rate = new_cost_per_1k["output"] / 1000.0
+
+        prompts = [pair[0] for pair in self._texts]
+        responses = [pair[1] for pair in self._texts]
+        encoded = self.encoding.encode_batch(prompts + responses,
+                                             num_threads=os.cpu_count() or 1)
+        split = len(prompts)
+        return (sum(len(tokens) for tokens in encoded[:split]) * in_rate
+                + sum(len(tokens) for tokens in encoded[split:]) * out_rate)
+
+    def log_cache_hit(self, operation: str) -> None:
+        """Record a client-side response-cache hit for an operation"""
+        self.operation_stats[operation]["cache_hits"] += 1
+
+    @property
+    def total_tokens(self) -> Dict:
+        """Dict view of the running token totals"""
+        return {"input": self._in_tok, "output": self._out_tok}
+
+    def print_call_stats(self, call_info: CallInfo) -> None:
+        """Print statistics for a single call (one buffered write, so the
+        stdout lock is taken once instead of per line)"""
+        sys.stdout.write(
+            "\nLLM Usage Stats:\n"
+            f"→ Operation: {call_info.operation}\n"
+            f"→ Model: {self.model_name}\n"
+            f"→ Input tokens: {call_info.input_tokens}\n"
+            f"→ Output tokens: {call_info.output_tokens}\n"
+            f"→ Cost: ${call_info.cost:.6f}\n"
+            f"→ Session total: ${self.total_cost:.6f}\n\n"
+        )
     
     def get_session_summary(self) -> Dict:
         """Get summary of all usage in this session"""
         return {
             "session_start": self.session_start,
             "session_duration": datetime.now() - self.session_start,
-            "total_calls": len(self.calls),
+            "total_calls": self.call_count,
             "total_tokens": self.total_tokens,
             "total_cost": self.total_cost,
             "operation_stats": self.operation_stats,
             "calls": self.calls
         }
     
-    def print_session_summary(self):
+    def print_session_summary(self) -> None:
         """Print detailed session summary"""
         summary = self.get_session_summary()
-        print("\nLLM Session Summary:")
-        print(f"→ Session duration: {summary['session_duration']}")
-        print(f"→ Total LLM API calls: {summary['total_calls']}")
-        print(f"→ Total tokens: {summary['total_tokens']['input']} in, {summary['total_tokens']['output']} out")
-        print(f"→ Total cost: ${summary['total_cost']:.6f}")
-        
-        # Print operation-specific stats if there are any operations
+        lines = [
+            "\nLLM Session Summary:",
+            f"→ Session duration: {summary['session_duration']}",
+            f"→ Total LLM API calls: {summary['total_calls']}",
+            f"→ Total tokens: {summary['total_tokens']['input']} in, {summary['total_tokens']['output']} out",
+            f"→ Total cost: ${summary['total_cost']:.6f}",
+        ]
+
+        # Include operation-specific stats if there are any operations
         if self.operation_stats:
-            print("\nBreakdown by operation:")
-            for op, stats in sorted(self.operation_stats.items(), key=lambda x: x[1]['count'], reverse=True):
-                print(f"  • {op}: {stats['count']} calls, {stats['input_tokens'] + stats['output_tokens']} tokens, ${stats['cost']:.6f}")
+            lines.append("\nBreakdown by operation:")
+            lines.extend(
+                f"  • {op}: {stats['count']} calls, {stats['input_tokens'] + stats['output_tokens']} tokens, ${stats['cost']:.6f}"
+                for op, stats in sorted(self.operation_stats.items(), key=lambda x: x[1]['count'], reverse=True)
+            )
+
+        # One locked write and one flush instead of a print per line
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def print_detailed_summary(self):
+    def print_detailed_summary(self) -> None:
         """Print a very detailed summary with all calls"""
         self.print_session_summary()
-        
-        print("\nDetailed LLM call history:")
+
+        lines = ["\nDetailed LLM call history:"]
+        # Resolve the local-time base once; each call's display time is then
+        # pure integer arithmetic instead of a datetime + strftime per entry
+        base = time.localtime(self._session_start_wall)
+        base_day_seconds = base.tm_hour * 3600 + base.tm_min * 60 + base.tm_sec
         for i, call in enumerate(self.calls):
-            print(f"Call {i+1} - {call['operation']} at {call['timestamp'].strftime('%H:%M:%S')}")
-            print(f"  Tokens: {call['input_tokens']} in, {call['output_tokens']} out")
-            print(f"  Cost: ${call['cost']:.6f}")
-            print("") 
\ No newline at end of file
+            elapsed = (call.t_ns - self._session_start_ns) // 1_000_000_000
+            day_seconds = (base_day_seconds + elapsed) % 86400
+            hours, remainder = divmod(day_seconds, 3600)
+            minutes, seconds = divmod(remainder, 60)
+            lines.append(f"Call {i+1} - {call.operation} at {hours:02d}:{minutes:02d}:{seconds:02d}")
+            lines.append(f"  Tokens: {call.input_tokens} in, {call.output_tokens} out")
+            lines.append(f"  Cost: ${call.cost:.6f}")
+            lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n") 
\ No newline at end of file
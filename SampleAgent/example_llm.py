@@ -37,21 +37,18 @@ def main():
         print(f"Using provider: {llm.provider}")
         print(f"Using model: {llm.model}")
         
-        # Demonstrate different operations
-        print("\n=== Example 1: Basic Generation ===")
+        # Build the three independent example prompts up front so they can be
+        # issued concurrently - total wall time is the slowest of the three
+        # calls rather than their sum
         basic_prompt = "Explain the concept of transfer learning in 2-3 sentences."
-        print(f"Sending prompt to {llm.model} via {llm.provider}...")
-        basic_response = llm.generate(basic_prompt)
-        print_response(basic_response, llm)
-        
-        print("\n=== Example 2: Weather-Based Search Terms Generation ===")
+
         # Example weather data
         weather_data = {
             "city": "Seattle",
             "temp": 5,
             "conditions": "Rain and overcast"
         }
-        
+
         # Create a prompt for generating search terms
         search_terms_prompt = f"""
 Given these weather conditions for {weather_data['city']}:
@@ -69,28 +66,7 @@ Examples:
 
 Respond with ONLY the search terms, separated by spaces. Keep it brief (max 7 words).
 """
-        
-        print(f"Generating weather-appropriate search terms for {weather_data['city']}...")
-        print(f"Weather: {weather_data['temp']}°C, {weather_data['conditions']}")
-        
-        # Use the search_terms operation for optimal settings
-        search_terms_response = llm.generate(
-            prompt=search_terms_prompt,
-            operation="search_terms"
-        )
-        
-        print_response(search_terms_response, llm)
-        
-        # Extract the search terms
-        if 'choices' in search_terms_response and search_terms_response['choices'][0]['message']['content']:
-            search_terms = search_terms_response['choices'][0]['message']['content'].strip()
-            print(f"\nGenerated search terms: {search_terms}")
-            
-            # Show how these terms would be used in a search query
-            search_query = f"{search_terms} attractions landmarks {weather_data['city']}"
-            print(f"Resulting search query: '{search_query}'")
-        
-        print("\n=== Example 3: City Verification ===")
+
         verify_prompt = """
 Analyze the location 'Cambridge' and provide information in the following JSON format:
 {
@@ -104,15 +80,33 @@ Analyze the location 'Cambridge' and provide information in the following JSON f
 
 Provide only the JSON response, no additional text.
 """
+
+        print("\nIssuing the three example requests concurrently...")
+        basic_response, search_terms_response, verify_response = llm.generate_many([
+            (basic_prompt, "generate"),
+            (search_terms_prompt, "search_terms"),
+            (verify_prompt, "verify_city"),
+        ])
+
+        print("\n=== Example 1: Basic Generation ===")
+        print_response(basic_response, llm, operation="generate")
+
+        print("\n=== Example 2: Weather-Based Search Terms Generation ===")
+        print(f"Weather: {weather_data['temp']}°C, {weather_data['conditions']}")
+        print_response(search_terms_response, llm, operation="search_terms")
+
+        # Extract the search terms
+        if 'choices' in search_terms_response and search_terms_response['choices'][0]['message']['content']:
+            search_terms = search_terms_response['choices'][0]['message']['content'].strip()
+            print(f"\nGenerated search terms: {search_terms}")
+            
+            # Show how these terms would be used in a search query
+            search_query = f"{search_terms} attractions landmarks {weather_data['city']}"
+            print(f"Resulting search query: '{search_query}'")
         
-        print("Verifying city information...")
-        verify_response = llm.generate(
-            prompt=verify_prompt,
-            operation="verify_city"
-        )
-        
-        print_response(verify_response, llm)
-        
+        print("\n=== Example 3: City Verification ===")
+        print_response(verify_response, llm, operation="verify_city")
+
         # Parse and display the JSON response
         if 'choices' in verify_response and verify_response['choices'][0]['message']['content']:
             try:
@@ -139,8 +133,12 @@ Provide only the JSON response, no additional text.
         print("  python example_llm.py openrouter                         # Use OpenRouter with default model (DeepSeek R1)")
         print("  python example_llm.py openrouter deepseek/deepseek-r1:free  # Use OpenRouter with DeepSeek R1 model")
 
-def print_response(response, llm):
-    """Print the response content and token usage information"""
+def print_response(response, llm, operation=None):
+    """Print the response content and token usage information
+
+    With concurrent generation last_call_info no longer matches a specific
+    response, so pass the operation to report that operation's usage instead.
+    """
     if 'choices' in response and response['choices'][0]['message']['content']:
         content = response['choices'][0]['message']['content']
         print("\nResponse:")
@@ -149,13 +147,17 @@ def print_response(response, llm):
         print("\nNo valid content in the response.")
         print("Response object:")
         print(response)
-    
+
     # Print token usage and cost
-    if hasattr(llm, 'cost_tracker') and hasattr(llm.cost_tracker, 'last_call_info'):
+    if operation and hasattr(llm, 'cost_tracker'):
+        if stats := llm.cost_tracker.operation_stats.get(operation):
+            print(f"\nToken usage: {stats['input_tokens']} input, {stats['output_tokens']} output")
+            print(f"Estimated cost: ${stats['cost']:.6f}")
+    elif hasattr(llm, 'cost_tracker') and hasattr(llm.cost_tracker, 'last_call_info'):
         call_info = llm.cost_tracker.last_call_info
         if call_info:
-            print(f"\nToken usage: {call_info['input_tokens']} input, {call_info['output_tokens']} output")
-            print(f"Estimated cost: ${call_info['cost']:.6f}")
+            print(f"\nToken usage: {call_info.input_tokens} input, {call_info.output_tokens} output")
+            print(f"Estimated cost: ${call_info.cost:.6f}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
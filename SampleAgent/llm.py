@@ -1,14 +1,74 @@
 # llm.py
 import os
+import time
+import random
+import asyncio
+import hashlib
 import requests
+from dataclasses import dataclass
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import tiktoken
-from typing import Dict, Optional, Callable
-from cost_tracker import CostTracker
+
+try:
+    import orjson  # C JSON codec, ~3-10x faster on chat payloads
+except ImportError:
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Callable, Tuple
+import sqlite3
+from cost_tracker import CostTracker, get_encoding
+
+# Disk tier for the deterministic response cache - survives process restarts
+# so developer iterations and CI reruns replay yesterday's completions from
+# disk instead of the network. LLM_DISK_CACHE=0 disables it (e.g. for tests
+# that must observe every request).
+_LLM_CACHE_PATH = os.path.join(os.path.dirname(__file__), 'llm_cache.db')
+LLM_DISK_CACHE_TTL = 3600
+
+@dataclass(frozen=True, slots=True)
+class ProviderConfig:
+    """Immutable per-provider wiring, resolved once at module load"""
+    api_url: str
+    api_key_env: str
+    handler: str
+    timeout: int
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff schedule for transient provider failures"""
+    max_attempts: int = 3
+    base: float = 0.25
+    max_backoff: float = 4.0
+
 
 class LLMClient:
     """Simple LLM client with token tracking using tiktoken"""
-    
+
+    # No per-instance __dict__: clients are created per request in server
+    # setups, and slot storage keeps each one compact
+    __slots__ = ("provider", "api_key", "model", "encoding", "model_config",
+                 "cost_tracker", "_resp_cache", "retry_policy", "fallback",
+                 "handler_name", "_handler", "api_url", "timeout",
+                 "_body_template", "_session", "dry_run", "_disk_cache",
+                 "_resp_cache_max", "_resp_cache_ttl", "_cache_hits", "_cache_misses")
+
+    # Circuit breaker shared across clients, keyed by (provider, model):
+    # after enough consecutive failures the key fast-fails (or fails over)
+    # for the cooldown window instead of burning retries on a dead endpoint.
+    _CIRCUIT: Dict[tuple, list] = {}
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_COOLDOWN = 60.0
+
+    # Response cache bounds. Only low-temperature operations (temperature
+    # <= this) are cached - sampling-heavy calls should stay fresh. 0.3
+    # covers the factual operations (verify_city, suggest_activity,
+    # search_terms, extract_city) while leaving default generation uncached.
+    RESPONSE_CACHE_MAX_ENTRIES = 1024
+    RESPONSE_CACHE_MAX_TEMPERATURE = 0.3
+
     # Default models and their costs per 1K tokens (in USD)
     MODELS = {
         "mistralai/Mixtral-8x7B-Instruct-v0.1": {
@@ -26,20 +86,20 @@ class LLMClient:
         }
     }
     
-    # Provider-specific configurations
+    # Provider-specific configurations (frozen - shared by all instances)
     PROVIDERS = {
-        "together": {
-            "api_url": "https://api.together.xyz/v1/chat/completions",
-            "api_key_env": "TOGETHER_API_KEY",
-            "handler": "_generate_together",
-            "timeout": 30  # 30 seconds timeout
-        },
-        "openrouter": {
-            "api_url": "https://openrouter.ai/api/v1/chat/completions",
-            "api_key_env": "OPENROUTER_API_KEY",
-            "handler": "_generate_openrouter",
-            "timeout": 60  # 60 seconds timeout for OpenRouter
-        }
+        "together": ProviderConfig(
+            api_url="https://api.together.xyz/v1/chat/completions",
+            api_key_env="TOGETHER_API_KEY",
+            handler="_generate_together",
+            timeout=30  # 30 seconds timeout
+        ),
+        "openrouter": ProviderConfig(
+            api_url="https://openrouter.ai/api/v1/chat/completions",
+            api_key_env="OPENROUTER_API_KEY",
+            handler="_generate_openrouter",
+            timeout=60  # 60 seconds timeout for OpenRouter
+        )
     }
     
     # Operation-specific settings for optimal performance
@@ -64,23 +124,70 @@ class LLMClient:
             "max_tokens": 50,    # Very short response needed
             "description": "Generate weather-appropriate search terms"
         },
+        "search_and_suggest": {
+            "temperature": 0.2,  # Factual, like suggest_activity
+            "max_tokens": 400,   # JSON with terms + tentative activity + reason
+            "description": "Combined search-term and tentative-activity generation"
+        },
         "generate": {
             "temperature": 0.7,  # Default for general responses
             "max_tokens": 512,   # Standard length
             "description": "Default settings for general operations"
         }
     }
+
+    class _OperationSettings(dict):
+        """operation -> (temperature, max_tokens); unknown operations fall
+        back to the defaults without a .get-plus-second-lookup per call"""
+        def __missing__(self, key):
+            return self['generate']
+
+    # Flattened view of OPERATION_SETTINGS for the hot path - one dict
+    # lookup yields both knobs as a tuple
+    _OP_SETTINGS = _OperationSettings(
+        (op, (cfg["temperature"], cfg["max_tokens"]))
+        for op, cfg in OPERATION_SETTINGS.items()
+    )
     
-    def __init__(self, provider="together", model=None):
+    def __init__(self, provider="together", model=None, cost_tracker: Optional[CostTracker] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 fallback: Optional["LLMClient"] = None,
+                 dry_run: bool = False):
         if provider not in self.PROVIDERS:
             raise ValueError(f"Provider '{provider}' not supported. Available providers: {list(self.PROVIDERS.keys())}")
-            
+
         self.provider = provider
         provider_config = self.PROVIDERS[provider]
-        self.api_key = os.getenv(provider_config["api_key_env"])
+
+        # Smoke-test mode: no tokenizer load, no API-key requirement, and
+        # generate answers with a canned empty response without any network
+        self.dry_run = dry_run
+        if dry_run:
+            self.api_key = None
+            self.model = model or "dry-run"
+            self.encoding = None
+            self.model_config = {"encoding": None, "cost": {"input": 0.0, "output": 0.0}}
+            self.cost_tracker = cost_tracker
+            self._resp_cache = OrderedDict()
+            self.retry_policy = retry_policy or RetryPolicy()
+            self.fallback = fallback
+            self.handler_name = provider_config.handler
+            self._handler = None
+            self.api_url = provider_config.api_url
+            self.timeout = provider_config.timeout
+            self._body_template = {"model": self.model}
+            self._session = None
+            self._disk_cache = None
+            self._resp_cache_max = self.RESPONSE_CACHE_MAX_ENTRIES
+            self._resp_cache_ttl = 3600
+            self._cache_hits = 0
+            self._cache_misses = 0
+            return
+
+        self.api_key = os.getenv(provider_config.api_key_env)
         
         if not self.api_key:
-            raise ValueError(f"API key not found. Please set the {provider_config['api_key_env']} environment variable.")
+            raise ValueError(f"API key not found. Please set the {provider_config.api_key_env} environment variable.")
         
         # Set default model based on provider if not specified
         if model is None:
@@ -94,33 +201,121 @@ class LLMClient:
         # Ensure the model is in our MODELS dictionary
         if self.model not in self.MODELS:
             # Use a default encoding and cost if model not found
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+            self.encoding = get_encoding("cl100k_base")
             print(f"Warning: Model '{self.model}' not found in MODELS dictionary. Using default encoding and cost.")
             self.model_config = {"encoding": "cl100k_base", "cost": {"input": 0.001, "output": 0.001}, "has_reasoning": False}
         else:
-            self.encoding = tiktoken.get_encoding(self.MODELS[self.model]["encoding"])
+            self.encoding = get_encoding(self.MODELS[self.model]["encoding"])
             self.model_config = self.MODELS[self.model]
             
-        self.cost_tracker = CostTracker(self.model)
+        # A caller-supplied tracker lets several clients (e.g. one per
+        # model) share a single encoding, call history and cost total
+        self.cost_tracker = cost_tracker or CostTracker(self.model)
+
+        # LRU of completed responses for identical deterministic requests
+        # (retries and idempotent fan-outs) - a hit skips the network
+        # entirely. Backed by a small on-disk sqlite tier so hits survive
+        # process restarts.
+        self._resp_cache = OrderedDict()
+        # Opened lazily on first use (mirroring BraveSearch) so
+        # disabled-cache runs never even create llm_cache.db
+        self._disk_cache = None
+        # Bounds are env-tunable; TTL keeps weather-dependent answers from
+        # outliving the data they were based on
+        self._resp_cache_max = int(os.getenv("LLM_CACHE_SIZE", self.RESPONSE_CACHE_MAX_ENTRIES))
+        self._resp_cache_ttl = int(os.getenv("LLM_CACHE_TTL", 3600))
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Transient-failure handling: retried with jittered backoff, and a
+        # secondary client can take over while this provider's circuit is open
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.fallback = fallback
         
-        # Set the handler method based on provider
-        self.handler_name = provider_config["handler"]
-        self.api_url = provider_config["api_url"]
-        self.timeout = provider_config.get("timeout", 30)  # Default timeout of 30 seconds
+        # Set the handler method based on provider - bound once here so
+        # generate skips the getattr resolution per call
+        self.handler_name = provider_config.handler
+        self._handler = getattr(self, self.handler_name)
+        self.api_url = provider_config.api_url
+        self.timeout = provider_config.timeout
+
+        # Static part of every request body - only the message content and
+        # sampling knobs vary per call (headers already live on the session)
+        self._body_template = {"model": self.model}
+
+        # Pooled session with keep-alive - a fresh connection per call paid a
+        # TLS handshake against the provider on every request. Auth and
+        # provider headers are resolved once here instead of per call.
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
+        self._session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        if provider == "openrouter":
+            self._session.headers.update({
+                "HTTP-Referer": os.getenv("OPENROUTER_REFERER", "http://localhost:8000"),  # Required by OpenRouter
+                "X-Title": os.getenv("OPENROUTER_TITLE", "SampleAgent")  # Optional but recommended
+            })
     
-    def generate(self, prompt: str, operation: str = "generate") -> Dict:
-        """Generate response with token tracking and operation-specific settings"""
-        # Count input tokens
-        input_tokens = len(self.encoding.encode(prompt))
-        
-        # Get operation-specific settings or defaults
-        settings = self.OPERATION_SETTINGS.get(operation, self.OPERATION_SETTINGS["generate"])
-        
+    def generate(self, prompt: str, operation: str = "generate", stream: bool = False) -> Dict:
+        """Generate response with token tracking and operation-specific settings
+
+        With stream=True the provider is asked to stream the completion and
+        the chunks are accumulated here; short JSON replies terminate as soon
+        as the braces balance, saving the tail of the generation.
+        """
+        if self.dry_run:
+            return {"choices": [{"message": {"content": ""}}]}
+
+        # Get operation-specific settings or defaults - one lookup, the
+        # table's __missing__ supplies the generate defaults
+        temperature, max_tokens = self._OP_SETTINGS[operation]
+
+        # Deterministic requests are answered from the response cache when the
+        # exact same (model, settings, prompt) was completed before
+        cache_key = None
+        if temperature <= self.RESPONSE_CACHE_MAX_TEMPERATURE:
+            cache_key = hashlib.blake2b(
+                f"{self.model}|{temperature}|{max_tokens}|{prompt}".encode(),
+                digest_size=16
+            ).digest()
+            if (entry := self._resp_cache.get(cache_key)) is not None:
+                expiry, cached = entry
+                if time.monotonic() < expiry:
+                    self._resp_cache.move_to_end(cache_key)
+                    self._cache_hits += 1
+                    self.cost_tracker.log_cache_hit(operation)
+                    return cached
+                del self._resp_cache[cache_key]
+            if (cached := self._disk_cache_get(cache_key)) is not None:
+                self._resp_cache[cache_key] = (time.monotonic() + self._resp_cache_ttl, cached)
+                self._cache_hits += 1
+                self.cost_tracker.log_cache_hit(operation)
+                return cached
+            self._cache_misses += 1
+
+        # Circuit breaker: a provider that keeps failing is skipped (or
+        # failed over) for the cooldown window instead of burning retries
+        circuit_key = (self.provider, self.model)
+        if self._circuit_open(circuit_key):
+            if self.fallback is not None:
+                print(f"Circuit open for {self.provider}/{self.model}; using fallback provider.")
+                return self.fallback.generate(prompt, operation, stream)
+            return {"error": "circuit_open",
+                    "message": f"{self.provider}/{self.model} is failing; retry after cooldown."}
+
         try:
-            # Make API call with optimized settings using the appropriate handler
-            handler = getattr(self, self.handler_name)
-            response = handler(prompt, settings)
-            
+            # Make API call with optimized settings using the pre-bound
+            # handler, retrying transient failures with jittered backoff
+            response = self._call_with_retries(prompt, temperature, max_tokens, stream)
+            self._record_success(circuit_key)
+
             # Track usage if response is valid
             if response and 'choices' in response:
                 # For models with reasoning, use reasoning as content if content is empty
@@ -130,66 +325,344 @@ class LLMClient:
                         content = choice['message']['content']
                         # If content is empty but reasoning exists, use reasoning as content
                         if not content and 'reasoning' in choice['message'] and choice['message']['reasoning']:
-                            # Extract a concise answer from the reasoning if possible
+                            # Extract a concise answer from the reasoning
                             reasoning = choice['message']['reasoning']
                             # Keep the original reasoning for reference
+                            # (an alias, not a copy)
                             choice['message']['original_reasoning'] = reasoning
-                            # Use reasoning as content if content is empty
-                            choice['message']['content'] = f"Based on my reasoning: {reasoning}"
+                            # Content gets a condensed tail, not the full
+                            # multi-KB trace - the trace would otherwise be
+                            # duplicated and re-tokenized for cost tracking
+                            choice['message']['content'] = self._summarize_reasoning(reasoning)
                 
-                # Get the content for token counting
+                # Prefer the provider's authoritative usage block (Together
+                # and OpenRouter both return one) over local tokenization -
+                # nothing is tokenized up front anymore; whatever usage
+                # doesn't cover is counted lazily (and memoized) in log_call
                 output_text = response['choices'][0]['message']['content']
-                call_info = self.cost_tracker.log_call(operation, prompt, output_text)
+                usage = response.get('usage') or {}
+                call_info = self.cost_tracker.log_call(
+                    operation, prompt, output_text,
+                    input_tokens=usage.get('prompt_tokens'),
+                    output_tokens=usage.get('completion_tokens'),
+                    cached_tokens=(usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0),
+                    model_name=self.model
+                )
                 
                 # Only print detailed stats in verbose mode
                 if os.getenv("VERBOSE_LLM", "0") == "1":
                     self.cost_tracker.print_call_stats(call_info)
-            
+
+                # Successful deterministic responses feed both cache tiers
+                if cache_key is not None:
+                    self._resp_cache[cache_key] = (time.monotonic() + self._resp_cache_ttl, response)
+                    while len(self._resp_cache) > self._resp_cache_max:
+                        self._resp_cache.popitem(last=False)
+                    self._disk_cache_put(cache_key, response)
+
             return response
         except requests.exceptions.Timeout:
+            self._record_failure(circuit_key)
             print(f"Request to {self.provider} timed out after {self.timeout} seconds.")
+            if self.fallback is not None:
+                return self.fallback.generate(prompt, operation, stream)
             return {"error": "timeout", "message": f"Request timed out after {self.timeout} seconds."}
         except Exception as e:
+            self._record_failure(circuit_key)
             print(f"Error making request to {self.provider}: {str(e)}")
+            if self.fallback is not None:
+                return self.fallback.generate(prompt, operation, stream)
             return {"error": "request_failed", "message": str(e)}
+
+    def _call_with_retries(self, prompt: str, temperature: float, max_tokens: int,
+                           stream: bool) -> Dict:
+        """Invoke the provider, retrying transient failures with jittered
+        exponential backoff
+
+        Covers timeouts and connection-level errors; HTTP-level 429/5xx (and
+        their Retry-After headers) are already retried by the session's
+        transport adapter before they ever surface here.
+        """
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
+            try:
+                return self._handler(prompt, temperature, max_tokens, stream=stream)
+            except (requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.RetryError):
+                if attempt + 1 >= policy.max_attempts:
+                    raise
+                delay = min(policy.max_backoff, policy.base * (2 ** attempt))
+                delay += random.random() * policy.base
+                print(f"Transient error from {self.provider}; retrying in {delay:.2f}s "
+                      f"(attempt {attempt + 2}/{policy.max_attempts})")
+                time.sleep(delay)
+
+    @classmethod
+    def _circuit_open(cls, key) -> bool:
+        state = cls._CIRCUIT.get(key)
+        if not state or state[0] < cls.CIRCUIT_FAILURE_THRESHOLD:
+            return False
+        if time.monotonic() - state[1] >= cls.CIRCUIT_COOLDOWN:
+            # Cooldown elapsed - drop the state so one probe call goes through
+            cls._CIRCUIT.pop(key, None)
+            return False
+        return True
+
+    @classmethod
+    def _record_failure(cls, key) -> None:
+        failures = cls._CIRCUIT.get(key, (0, 0.0))[0] + 1
+        cls._CIRCUIT[key] = [failures, time.monotonic()]
+
+    @classmethod
+    def _record_success(cls, key) -> None:
+        cls._CIRCUIT.pop(key, None)
     
-    def _generate_together(self, prompt: str, settings: Dict) -> Dict:
+    def cache_stats(self) -> Dict:
+        """Hit/miss/size counters for the in-memory response cache"""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._resp_cache),
+        }
+
+    @staticmethod
+    def _disk_cache_enabled() -> bool:
+        return os.getenv('LLM_DISK_CACHE', '1') != '0'
+
+    def _init_disk_cache(self):
+        """Open (and create if needed) the on-disk response cache"""
+        conn = sqlite3.connect(_LLM_CACHE_PATH, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT,
+                    ts INTEGER
+                )
+            ''')
+        return conn
+
+    def _disk_cache_get(self, cache_key: bytes) -> Optional[Dict]:
+        if not self._disk_cache_enabled():
+            return None
+        if self._disk_cache is None:
+            self._disk_cache = self._init_disk_cache()
+        row = self._disk_cache.execute(
+            'SELECT response, ts FROM llm_cache WHERE key = ?', (cache_key.hex(),)
+        ).fetchone()
+        if row and int(time.time()) - row[1] < LLM_DISK_CACHE_TTL:
+            try:
+                return orjson.loads(row[0]) if orjson is not None else json.loads(row[0])
+            except ValueError:
+                return None
+        return None
+
+    def _disk_cache_put(self, cache_key: bytes, response: Dict) -> None:
+        if not self._disk_cache_enabled():
+            return
+        if self._disk_cache is None:
+            self._disk_cache = self._init_disk_cache()
+        try:
+            payload = (orjson.dumps(response).decode()
+                       if orjson is not None else json.dumps(response))
+        except (TypeError, ValueError):
+            return  # non-serializable response shapes just skip the disk tier
+        with self._disk_cache:
+            self._disk_cache.execute('''
+                INSERT OR REPLACE INTO llm_cache (key, response, ts)
+                VALUES (?, ?, ?)
+            ''', (cache_key.hex(), payload, int(time.time())))
+
+    async def agenerate(self, prompt: str, operation: str = "generate",
+                        stream: bool = False) -> Dict:
+        """Async entry point: run generate on a worker thread
+
+        Lets async callers overlap independent completions with
+        asyncio.gather. The blocking requests call moves off the event loop;
+        connection reuse still comes from the pooled session (an httpx
+        AsyncClient would be the natural upgrade if it ever becomes a
+        dependency here).
+        """
+        return await asyncio.to_thread(self.generate, prompt, operation, stream)
+
+    def generate_many(self, prompts: List[Tuple[str, str]], max_workers: int = 4) -> List[Dict]:
+        """Run several independent generate calls concurrently
+
+        Args:
+            prompts: list of (prompt, operation) tuples
+            max_workers: cap on in-flight requests
+
+        Returns the responses in input order; wall time approaches the
+        slowest call instead of the sum. Uses a thread pool rather than an
+        async client - callers here are synchronous and the network wait
+        releases the GIL anyway.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.generate, prompt, operation)
+                       for prompt, operation in prompts]
+            return [future.result() for future in futures]
+
+    def _generate_together(self, prompt: str, temperature: float, max_tokens: int,
+                           stream: bool = False) -> Dict:
         """Make API call to Together AI with operation-specific settings"""
-        response = requests.post(
-            self.api_url,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": settings["temperature"],
-                "max_tokens": settings["max_tokens"]
-            },
-            timeout=self.timeout
-        )
-        return response.json()
-    
-    def _generate_openrouter(self, prompt: str, settings: Dict) -> Dict:
-        """Make API call to OpenRouter with operation-specific settings"""
-        response = requests.post(
-            self.api_url,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": os.getenv("OPENROUTER_REFERER", "http://localhost:8000"),  # Required by OpenRouter
-                "X-Title": os.getenv("OPENROUTER_TITLE", "SampleAgent")  # Optional but recommended
-            },
-            json={
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": settings["temperature"],
-                "max_tokens": settings["max_tokens"]
-            },
-            timeout=self.timeout
-        )
-        return response.json()
+        payload = {
+            **self._body_template,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+        return self._post(payload, stream)
+
+    def _generate_openrouter(self, prompt: str, temperature: float, max_tokens: int,
+                             stream: bool = False) -> Dict:
+        """Make API call to OpenRouter with operation-specific settings
+
+        The OpenRouter-specific headers live on the pooled session."""
+        payload = {
+            **self._body_template,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+        return self._post(payload, stream)
+
+    def _post(self, payload: Dict, stream: bool) -> Dict:
+        """POST a completion request and decode the reply
+
+        With orjson installed the body is pre-encoded to bytes (requests'
+        json= kwarg goes through stdlib json.dumps) and the reply is decoded
+        straight from the raw content.
+        """
+        if orjson is not None:
+            response = self._session.post(self.api_url, data=orjson.dumps(payload),
+                                          timeout=self.timeout, stream=stream)
+        else:
+            response = self._session.post(self.api_url, json=payload,
+                                          timeout=self.timeout, stream=stream)
+        if stream:
+            # Error replies are plain JSON bodies, not SSE - consuming them as
+            # a stream would fabricate an empty-content success that the
+            # response caches then keep serving. Return the decoded error
+            # body, same shape as the non-stream path.
+            if response.status_code != 200:
+                return orjson.loads(response.content) if orjson is not None else response.json()
+            return self._consume_stream(response)
+        return orjson.loads(response.content) if orjson is not None else response.json()
+
+    @staticmethod
+    def _summarize_reasoning(reasoning: str) -> str:
+        """Condense a reasoning trace into short displayable content
+
+        Keeps the tail after the last conclusion marker (where R1-style
+        traces state their answer), capped at 500 characters.
+        """
+        tail = reasoning
+        for marker in ("Answer:", "Therefore", "In conclusion"):
+            index = reasoning.rfind(marker)
+            if index != -1:
+                tail = reasoning[index:]
+                break
+        return f"Based on my reasoning: {tail[:500]}"
+
+    @staticmethod
+    def _iter_sse(response):
+        """Yield content deltas from an SSE completion stream
+
+        Closes the underlying response when the stream ends or the consumer
+        stops early.
+        """
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                line = line.decode('utf-8') if isinstance(line, bytes) else line
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    return
+                try:
+                    chunk = orjson.loads(data) if orjson is not None else json.loads(data)
+                except ValueError:  # covers both orjson and stdlib decode errors
+                    continue
+                delta = chunk.get('choices', [{}])[0].get('delta', {}).get('content') or ''
+                if delta:
+                    yield delta
+        finally:
+            response.close()
+
+    def _consume_stream(self, response) -> Dict:
+        """Accumulate a server-sent-events completion stream into the usual
+        response shape ({'choices': [{'message': {'content': ...}}]})
+
+        When the model is emitting a JSON object (the reply starts with '{'),
+        reading stops as soon as the braces balance, so short structured
+        replies like city verification don't wait for trailing tokens.
+        Brace counting is a heuristic - string values containing braces could
+        fool it - but the structured prompts here never produce those.
+        """
+        parts = []
+        depth = 0
+        in_json = False
+        deltas = self._iter_sse(response)
+        try:
+            for delta in deltas:
+                parts.append(delta)
+                if in_json or delta.lstrip().startswith('{'):
+                    in_json = True
+                    depth += delta.count('{') - delta.count('}')
+                    if depth <= 0:
+                        break
+        finally:
+            deltas.close()
+        return {"choices": [{"message": {"content": "".join(parts)}}]}
+
+    def stream_generate(self, prompt: str, operation: str = "generate"):
+        """Yield completion chunks as they arrive
+
+        Interactive callers can render output at time-to-first-token instead
+        of waiting for the full completion. Usage is logged against the
+        accumulated text once the stream finishes (or the consumer stops).
+        """
+        temperature, max_tokens = self._OP_SETTINGS[operation]
+        payload = {
+            **self._body_template,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        if orjson is not None:
+            response = self._session.post(self.api_url, data=orjson.dumps(payload),
+                                          timeout=self.timeout, stream=True)
+        else:
+            response = self._session.post(self.api_url, json=payload,
+                                          timeout=self.timeout, stream=True)
+
+        # An error reply is a plain JSON body, not SSE - stop before the
+        # iterator fabricates an empty stream (and before anything is logged)
+        if response.status_code != 200:
+            print(f"Error from {self.provider}: HTTP {response.status_code} on streamed request")
+            response.close()
+            return
+
+        parts = []
+        deltas = self._iter_sse(response)
+        try:
+            for delta in deltas:
+                parts.append(delta)
+                yield delta
+        finally:
+            deltas.close()
+            self.cost_tracker.log_call(operation, prompt, "".join(parts),
+                                       model_name=self.model)
     
     @property
     def total_cost(self):
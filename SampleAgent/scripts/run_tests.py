@@ -15,40 +15,60 @@ import argparse
 import subprocess
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 import time
 
 def run_command(command, description):
-    """Run a command and print its output"""
+    """Run a command (argv list, no shell) and stream its output
+
+    Streaming line by line gives immediate feedback on long pytest runs and
+    avoids buffering the whole output in memory the way capture_output did.
+    """
     print(f"\n=== {description} ===")
-    result = subprocess.run(command, shell=True, capture_output=True, text=True)
-    print(result.stdout)
-    if result.stderr:
-        print("Errors:", result.stderr)
-    return result.returncode == 0
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True, bufsize=1)
+    except FileNotFoundError:
+        # argv lists don't go through a shell, so a missing tool raises
+        # instead of printing a shell error - keep the old behavior of
+        # reporting the failure and moving on
+        print(f"❌ {command[0]} not installed")
+        return False
+    for line in process.stdout:
+        print(line, end='')
+    return process.wait() == 0
 
 def run_unit_tests(args):
     """Run unit tests with optional coverage"""
-    cmd = "pytest tests/ -v"
+    cmd = ["pytest", "tests/", "-v"]
+    # Distribute across cores when pytest-xdist is installed - the suite is
+    # mock-heavy and embarrassingly parallel (RequestsMock fixtures are
+    # function-scoped, so each worker owns its own mocks)
+    try:
+        import xdist  # noqa: F401
+        cmd += ["-n", str(os.cpu_count() or 2)]
+    except ImportError:
+        pass
     if args.coverage:
-        cmd += " --cov=. --cov-report=html"
+        cmd += ["--cov=.", "--cov-report=html"]
     if args.pattern:
-        cmd += f" -k {args.pattern}"
+        cmd += ["-k", args.pattern]
     return run_command(cmd, "Running Unit Tests")
 
 def run_integration_tests(args):
     """Run integration tests"""
-    cmd = "pytest tests/ -v -m integration"
+    cmd = ["pytest", "tests/", "-v", "-m", "integration"]
     if args.pattern:
-        cmd += f" -k {args.pattern}"
+        cmd += ["-k", args.pattern]
     return run_command(cmd, "Running Integration Tests")
 
 def run_agent_eval(args):
     """Run agent evaluation"""
-    cmd = "python -m agent_eval.evaluator"
+    cmd = [sys.executable, "-m", "agent_eval.evaluator"]
     if args.mode:
-        cmd += f" --mode={args.mode}"
+        cmd += [f"--mode={args.mode}"]
     success = run_command(cmd, "Running Agent Evaluation")
     
     # Display results summary
@@ -66,35 +86,58 @@ def run_agent_eval(args):
                     print(f"- {rec}")
     return success
 
+def run_command_capture(command):
+    """Run a command and return (ok, combined output) without printing
+
+    Used when several commands run concurrently - each command's output is
+    buffered whole so the logs don't interleave. Takes an argv list.
+    """
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        # Linters aren't in requirements.txt; report instead of raising out
+        # of the worker thread
+        return False, f"{command[0]} not installed"
+    output = result.stdout
+    if result.stderr:
+        output += "\nErrors: " + result.stderr
+    return result.returncode == 0, output.strip()
+
 def run_linting():
-    """Run code quality checks"""
-    success = True
+    """Run code quality checks - the three linters are independent CPU-bound
+    processes, so they run concurrently and wall time is the slowest one"""
     print("\n=== Running Code Quality Checks ===")
-    
-    # Run black
-    print("\nChecking code formatting (black):")
-    if not run_command("black . --check", ""):
-        print("❌ Code formatting issues found. Run 'black .' to fix.")
-        success = False
-    else:
-        print("✓ Code formatting OK")
-    
-    # Run flake8
-    print("\nChecking code style (flake8):")
-    if not run_command("flake8 . --count --select=E9,F63,F7,F82 --show-source --statistics", ""):
-        print("❌ Code style issues found")
-        success = False
-    else:
-        print("✓ Code style OK")
-    
-    # Run mypy
-    print("\nChecking type hints (mypy):")
-    if not run_command("mypy .", ""):
-        print("❌ Type checking issues found")
-        success = False
-    else:
-        print("✓ Type checking OK")
-    
+    checks = [
+        ("\nChecking code formatting (black):",
+         ["black", ".", "--check"],
+         "❌ Code formatting issues found. Run 'black .' to fix.",
+         "✓ Code formatting OK"),
+        ("\nChecking code style (flake8):",
+         ["flake8", ".", "--count", "--select=E9,F63,F7,F82", "--show-source", "--statistics"],
+         "❌ Code style issues found",
+         "✓ Code style OK"),
+        ("\nChecking type hints (mypy):",
+         ["mypy", "."],
+         "❌ Type checking issues found",
+         "✓ Type checking OK"),
+    ]
+
+    success = True
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(run_command_capture, cmd)
+                   for _, cmd, _, _ in checks]
+        # Report in the fixed order regardless of completion order
+        for (header, _, fail_msg, ok_msg), future in zip(checks, futures):
+            ok, output = future.result()
+            print(header)
+            if output:
+                print(output)
+            if ok:
+                print(ok_msg)
+            else:
+                print(fail_msg)
+                success = False
+
     return success
 
 def check_environment():
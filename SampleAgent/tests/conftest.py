@@ -0,0 +1,15 @@
+"""Shared pytest configuration for the Weather Agent test suite."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _disable_disk_caches(monkeypatch):
+    """Keep the on-disk Brave/LLM response caches out of test runs
+
+    The mocked-HTTP tests must observe every request: a cache file populated
+    by a previous run would answer before the responses mocks fire (hidden by
+    assert_all_requests_are_fired=False) and leave *.db files in the tree.
+    """
+    monkeypatch.setenv("BRAVE_SEARCH_CACHE", "0")
+    monkeypatch.setenv("LLM_DISK_CACHE", "0")
@@ -6,7 +6,6 @@ These fixtures provide mock data and configurations for testing.
 import json
 import pytest
 from pathlib import Path
-import responses
 import os
 
 # Constants
@@ -21,19 +20,19 @@ def mock_env(monkeypatch):
     monkeypatch.setenv("TOGETHER_API_KEY", MOCK_API_KEY)
     return monkeypatch
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def weather_responses():
-    """Load mock weather API responses"""
+    """Load mock weather API responses (parsed once per test session)"""
     with open(FIXTURES_DIR / "weather_responses.json") as f:
         return json.load(f)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def brave_responses():
     """Load mock Brave Search API responses"""
     with open(FIXTURES_DIR / "brave_search_responses.json") as f:
         return json.load(f)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def llm_responses():
     """Mock LLM responses for various operations"""
     return {
@@ -88,6 +87,7 @@ def llm_responses():
 @pytest.fixture
 def mock_openweather(weather_responses):
     """Mock OpenWeather API responses"""
+    import responses  # deferred - only mock fixtures need it
     with responses.RequestsMock() as rsps:
         # Success responses for various cities
         for city, data in weather_responses["openweather"]["success"].items():
@@ -132,28 +132,34 @@ def mock_openweather(weather_responses):
 @pytest.fixture
 def mock_llm_client(llm_responses):
     """Mock LLM client for testing"""
+    import re
+
     class MockLLMClient:
         def __init__(self):
             self.responses = llm_responses
-            
-        def generate(self, prompt, operation="generate"):
-            # Simple matching logic for testing
+            # One compiled alternation per operation instead of scanning the
+            # prompt once per known city on every generate call
+            self._patterns = {
+                operation: re.compile('|'.join(re.escape(city) for city in cities))
+                for operation, cities in self.responses.items()
+            }
+
+        def generate(self, prompt, operation="generate", **kwargs):
+            # Simple matching logic for testing: single scan of the prompt
             if operation == "verify_city":
-                for city, response in self.responses["verify_city"].items():
-                    if city in prompt:
-                        return response
+                if match := self._patterns["verify_city"].search(prompt):
+                    return self.responses["verify_city"][match.group(0)]
                 return self.responses["verify_city"]["NonexistentCity123"]
-                
+
             elif operation == "suggest_activity":
-                for city, response in self.responses["suggest_activity"].items():
-                    if city in prompt:
-                        return response
+                if match := self._patterns["suggest_activity"].search(prompt):
+                    return self.responses["suggest_activity"][match.group(0)]
                 # Default response
                 return self.responses["suggest_activity"]["London"]
-            
+
             # Default empty response
             return {"choices": [{"message": {"content": "{}"}}]}
-    
+
     return MockLLMClient()
 
 @pytest.fixture
@@ -180,6 +186,7 @@ def mock_activity_suggester(mock_llm_client):
 @pytest.fixture
 def mock_weatherapi(weather_responses):
     """Mock WeatherAPI.com responses"""
+    import responses  # deferred - only mock fixtures need it
     with responses.RequestsMock() as rsps:
         # Success responses
         for city, data in weather_responses["weatherapi"]["success"].items():
@@ -210,6 +217,7 @@ def mock_weatherapi(weather_responses):
 @pytest.fixture
 def mock_brave_search(brave_responses):
     """Mock Brave Search API responses"""
+    import responses  # deferred - only mock fixtures need it
     with responses.RequestsMock() as rsps:
         # Success responses
         base_url = "https://api.search.brave.com/res/v1/web/search"
@@ -255,7 +263,7 @@ def mock_brave_search(brave_responses):
         
         yield rsps
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_cities():
     """Test cities with expected weather and activities"""
     return {
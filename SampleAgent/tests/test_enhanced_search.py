@@ -21,15 +21,18 @@ Examples:
 import os
 import sys
 import time
-from dotenv import load_dotenv
 from llm import LLMClient
 from tools.brave_search import BraveSearch
 from tools.activity_suggester import ActivitySuggester
 
 def main():
-    # Load environment variables
+    # Load environment variables (imported here to keep module import light)
+    from dotenv import load_dotenv
     load_dotenv()
     
+    # DRY_RUN=1 smoke-runs the wiring without tokenizer loads or API keys
+    dry_run = os.getenv("DRY_RUN") == "1"
+
     # Check for API keys
     brave_api_key = os.getenv('BRAVE_API_KEY')
     if not brave_api_key:
@@ -42,11 +45,11 @@ def main():
     model = os.getenv('LLM_MODEL') or "mistralai/Mixtral-8x7B-Instruct-v0.1"
     
     # Check for provider-specific API keys
-    if provider == "together" and not os.getenv("TOGETHER_API_KEY"):
+    if not dry_run and provider == "together" and not os.getenv("TOGETHER_API_KEY"):
         print("Error: TOGETHER_API_KEY environment variable not set.")
         print("Please set it in your .env file.")
         sys.exit(1)
-    elif provider == "openrouter" and not os.getenv("OPENROUTER_API_KEY"):
+    elif not dry_run and provider == "openrouter" and not os.getenv("OPENROUTER_API_KEY"):
         print("Error: OPENROUTER_API_KEY environment variable not set.")
         print("Please set it in your .env file.")
         sys.exit(1)
@@ -82,7 +85,7 @@ def main():
     
     # Initialize components
     print("\n🔧 Initializing components...")
-    llm = LLMClient(provider=provider, model=model)
+    llm = LLMClient(provider=provider, model=model, dry_run=dry_run)
     brave_search = BraveSearch(brave_api_key)
     activity_suggester = ActivitySuggester(brave_search, llm)
     
@@ -114,8 +117,9 @@ def main():
     print(f"\n⏱️ Total processing time: {elapsed_time:.2f} seconds")
     
     # Print session summary
-    print("\n📊 LLM Usage Summary:")
-    llm.cost_tracker.print_session_summary()
+    if llm.cost_tracker:
+        print("\n📊 LLM Usage Summary:")
+        llm.cost_tracker.print_session_summary()
     
     print("\n" + "="*60)
     print("🧪 TEST COMPLETE")
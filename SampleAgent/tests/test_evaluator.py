@@ -0,0 +1,58 @@
+"""
+Unit tests for the Weather Agent evaluator scoring
+
+These pin down the scoring regexes - in particular that the 🎯 marker and
+the °C temperature pattern are real UTF-8 literals that actually match agent
+output (a mis-encoded pattern here would silently zero every score).
+"""
+
+import pytest
+
+from agent_eval.evaluator import WeatherAgentEvaluator
+
+
+@pytest.fixture
+def evaluator():
+    # Path doesn't need to exist for scoring tests; loading failures just
+    # produce an empty test-case list
+    return WeatherAgentEvaluator("agent_eval/test_cases.json")
+
+
+class TestWeatherResponseScoring:
+    """Test suite for evaluate_weather_response"""
+
+    def test_full_weather_response_scores_high(self, evaluator):
+        """Temperature, conditions and city together should score >= 0.9"""
+        score, reasons = evaluator.evaluate_weather_response(
+            "Current weather in Tokyo: 22.3°C, clear", {"city": "Tokyo"}
+        )
+        assert score >= 0.9
+        assert "Contains temperature" in reasons
+        assert "Contains weather conditions" in reasons
+        assert "Contains city name" in reasons
+
+    def test_missing_temperature_loses_points(self, evaluator):
+        score, reasons = evaluator.evaluate_weather_response(
+            "Weather in Tokyo: quite pleasant", {"city": "Tokyo"}
+        )
+        assert "Contains temperature" not in reasons
+        assert score < 0.9
+
+
+class TestSuggestionScoring:
+    """Test suite for evaluate_suggestion"""
+
+    def test_known_attraction_matches(self, evaluator):
+        score, reasons = evaluator.evaluate_suggestion(
+            "\n🎯 Suggested Activity: Visit Space Needle",
+            {"known_attractions": ["Space Needle"]}
+        )
+        assert score >= 0.4
+        assert any("Space Needle" in r for r in reasons)
+
+    def test_unformatted_suggestion_scores_low(self, evaluator):
+        score, reasons = evaluator.evaluate_suggestion(
+            "You should go outside today.", {}
+        )
+        assert score == pytest.approx(0.1)
+        assert reasons == ["Suggestion format incorrect"]
@@ -1,7 +1,8 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Any, Callable, Optional
 import os
+import sys
 
 class ToolCategory(Enum):
     DATA_PROCESSING = "data_processing"
@@ -9,22 +10,37 @@ class ToolCategory(Enum):
     FILE_OPERATION = "file_operation"
     CALCULATION = "calculation"
 
-@dataclass
+@dataclass(slots=True)
 class Tool:
+    # Slotted - no per-instance __dict__, which matters once registries
+    # carry many tools. function stays mutable (tests re-point it at mocks).
     name: str
     description: str
     category: ToolCategory
     function: Optional[Callable]
     parameters: Dict[str, Dict[str, Any]]
     required_params: List[str]
+    # Derived fields, excluded from init/repr
+    _metadata: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    _category_value: str = field(init=False, repr=False)
+    _required_set: frozenset = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Interned once so the list paths read a shared string instead of
+        # going through the Enum .value descriptor per access
+        self._category_value = sys.intern(self.category.value)
+        # Frozen set view of the required params - validation becomes one
+        # C-level subset check instead of a Python membership loop
+        self._required_set = frozenset(self.required_params)
 
     def validate_params(self, params: Dict[str, Any]) -> bool:
         """Validate that all required parameters are present"""
-        return all(param in params for param in self.required_params)
+        return self._required_set.issubset(params)
 
     def execute(self, **params) -> Any:
         """Execute the tool with given parameters"""
         if not self.validate_params(params):
+            # Error path only: keep declaration order in the message
             missing = [p for p in self.required_params if p not in params]
             raise ValueError(f"Missing required parameters: {missing}")
         
@@ -36,31 +52,50 @@ class Tool:
 class ToolRegistry:
     def __init__(self):
         self.tools: Dict[str, Tool] = {}
-    
+        # Category buckets maintained at registration time, so per-category
+        # listing touches only the tools in that bucket instead of building
+        # and filtering metadata for the whole registry
+        self._by_category: Dict[ToolCategory, List[Tool]] = {}
+        # Snapshot of list_tools() output, rebuilt only after registration
+        # changes - callers ask for the catalog once per turn, repeatedly
+        self._cached_list: Optional[List[Dict[str, Any]]] = None
+
     def register_tool(self, tool: Tool) -> None:
         """Register a new tool"""
+        if (existing := self.tools.get(tool.name)) is not None:
+            # Re-registration replaces the old bucket entry too
+            self._by_category[existing.category].remove(existing)
         self.tools[tool.name] = tool
-    
+        self._by_category.setdefault(tool.category, []).append(tool)
+        # Precompute the metadata view once; invalidate the list snapshot
+        tool._metadata = self._tool_to_dict(tool)
+        self._cached_list = None
+
     def get_tool(self, name: str) -> Optional[Tool]:
         """Get a tool by name"""
         return self.tools.get(name)
-    
+
+    @staticmethod
+    def _tool_to_dict(tool: Tool) -> Dict[str, Any]:
+        """Metadata view of a single tool"""
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "category": tool._category_value,
+            "parameters": tool.parameters,
+            "required_params": tool.required_params
+        }
+
     def list_tools(self) -> List[Dict[str, Any]]:
-        """List all registered tools with their metadata"""
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description,
-                "category": tool.category.value,
-                "parameters": tool.parameters,
-                "required_params": tool.required_params
-            }
-            for tool in self.tools.values()
-        ]
+        """List all registered tools with their metadata
+
+        Returns the cached snapshot (a fresh outer list, shared metadata
+        dicts - callers treat tool metadata as read-only).
+        """
+        if self._cached_list is None:
+            self._cached_list = [tool._metadata for tool in self.tools.values()]
+        return list(self._cached_list)
 
     def list_tools_by_category(self, category: ToolCategory) -> List[Dict[str, Any]]:
         """List tools filtered by category"""
-        return [
-            tool_info for tool_info in self.list_tools()
-            if tool_info["category"] == category.value
-        ] 
\ No newline at end of file
+        return [tool._metadata for tool in self._by_category.get(category, [])] 
\ No newline at end of file
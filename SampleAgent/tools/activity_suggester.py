@@ -1,89 +1,323 @@
 """Activity suggestion tool that uses LLM to provide contextual recommendations"""
 
-from typing import Optional, Dict
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Optional, Dict
 from .brave_search import BraveSearch
 
+# Suggestion prompt split so the static preamble comes first and stays
+# byte-identical across calls - that's what lets provider-side prefix
+# caching reuse the prefill for it. (The configured OpenAI-compatible
+# providers apply prefix caching implicitly; an Anthropic-style explicit
+# cache_control marker would attach to this block if such a provider were
+# added.) All per-call variables live in the tail.
+_SUGGESTION_PREAMBLE = """You are a seasoned local guide with years of experience in the city you are asked about, and your answers need to impress a tourist visiting it.
+
+Given weather conditions and web search results for a city, suggest ONE specific attraction or activity that is most appropriate, and explain why it's a good choice given the weather.
+
+Your response should be in this format:
+"\\n\\nRecommended Activity: [Your specific activity recommendation]
+[2-3 sentences explaining why this is a good choice for the weather conditions]"
+"""
+
+_SUGGESTION_TAIL = """
+City: {city}
+Weather conditions: {temp}°C, {conditions}
+{planning_context}
+
+Search results about {city}:
+{search_result}
+
+Based on these weather conditions and the search results, what ONE specific activity or attraction would you recommend to a visitor to {city} {time_context}?
+"""
+
+
+def _weather_to_terms(temp, conditions: str) -> str:
+    """Map weather to search terms with the same decision table the old
+    term-generation prompt spelled out - a deterministic mapping has no
+    business costing an LLM round-trip"""
+    conditions = conditions.lower()
+    if 'rain' in conditions or 'drizzle' in conditions or 'storm' in conditions:
+        return "indoor museum gallery theater covered"
+    if 'snow' in conditions:
+        return "indoor warm cozy museum cafe"
+    try:
+        temp = float(temp)
+    except (TypeError, ValueError):
+        return "popular attractions sightseeing"
+    if temp > 30:
+        return "air-conditioned indoor aquarium mall shade"
+    if temp < 5:
+        return "indoor warm cozy museum cafe"
+    return "outdoor park garden walking sightseeing"
+
+
 class ActivitySuggester:
     """Suggests weather-appropriate activities using LLM coordination"""
-    
+
     def __init__(self, brave_search: BraveSearch, llm_client):
         self.brave_search = brave_search
         self.llm = llm_client
+        # Capability resolved once - the per-call log sites just test a bool
+        self._track_cost = hasattr(llm_client, 'cost_tracker')
+        # Two workers: the targeted search and its hedged fallback can be in
+        # flight at once (see _run_search)
+        self._pool = ThreadPoolExecutor(max_workers=2)
     
-    def get_activity_suggestion(self, city: str, weather: dict, is_forecast: bool = False) -> Optional[str]:
+    def get_activity_suggestion(self, city: str, weather: dict, is_forecast: bool = False,
+                                precomputed_search: Optional[str] = None) -> Optional[str]:
         """Get weather-appropriate activity suggestion using LLM coordination
-        
+
         Args:
             city: City name
             weather: Weather data dict with 'temp' and 'conditions'
             is_forecast: Whether this is forecast data (future) or current weather
-        
+            precomputed_search: Search results fetched by the caller in parallel
+                with the weather lookup; when provided, the search-term
+                generation and Brave roundtrip are skipped entirely
+
         Returns:
             Activity suggestion string or None if not available
         """
-        
-        # 1. First, use LLM to generate weather-appropriate search terms
-        print("\n🤔 Thinking: Generating weather-appropriate search terms...")
-        
-        weather_prompt = f"""
+        if precomputed_search:
+            print("→ Using pre-fetched search results")
+            return self._suggest_from_search(city, weather, is_forecast, precomputed_search)
+
+        # 1. Search terms come from the deterministic weather mapping (no
+        # tokens spent); one LLM call supplies only the tentative activity
+        plan = self._plan_search_and_activity(city, weather)
+        search_terms = _weather_to_terms(weather.get('temp'), str(weather.get('conditions', '')))
+
+        # 2-3. Run the targeted search (with the hedged fallback chain)
+        search_result = self._run_search(city, search_terms)
+        if not search_result:
+            return None
+
+        # 4. If the search results corroborate the tentative activity, the
+        # answer is already in hand - no second LLM round-trip needed
+        if corroborated := self._corroborated_suggestion(plan, search_result):
+            return corroborated
+
+        # Otherwise fall back to the full suggestion prompt over the results
+        return self._suggest_from_search(city, weather, is_forecast, search_result)
+
+    def get_activity_suggestion_stream(self, city: str, weather: dict,
+                                       is_forecast: bool = False,
+                                       precomputed_search: Optional[str] = None):
+        """Yield the activity suggestion incrementally
+
+        When the final LLM leg runs and the client supports streaming, chunks
+        arrive at time-to-first-token; locally-assembled answers (plan
+        corroboration) and non-streaming clients yield one chunk.
+        """
+        if not hasattr(self.llm, 'stream_generate'):
+            if suggestion := self.get_activity_suggestion(city, weather, is_forecast,
+                                                          precomputed_search):
+                yield suggestion
+            return
+
+        if precomputed_search:
+            print("→ Using pre-fetched search results")
+            search_result = precomputed_search
+        else:
+            plan = self._plan_search_and_activity(city, weather)
+            search_terms = _weather_to_terms(weather.get('temp'), str(weather.get('conditions', '')))
+            search_result = self._run_search(city, search_terms)
+            if not search_result:
+                return
+            if corroborated := self._corroborated_suggestion(plan, search_result):
+                yield corroborated
+                return
+
+        print("\n🤔 Thinking: Analyzing weather conditions and search results...")
+        print("🧠 Streaming activity suggestion")
+        prompt = self._build_suggestion_prompt(city, weather, is_forecast, search_result)
+        yield from self.llm.stream_generate(prompt, operation="suggest_activity")
+
+    @staticmethod
+    def _build_suggestion_prompt(city: str, weather: dict, is_forecast: bool,
+                                 search_result: str) -> str:
+        """Static preamble plus the per-call tail (see the module constants)"""
+        # Adjust the variable tail based on whether this is current or
+        # forecast data; the static preamble stays byte-identical
+        if is_forecast:
+            time_context = "for the forecasted weather"
+            planning_context = "This is a future forecast, so the suggestion should be appropriate for planning ahead."
+        else:
+            time_context = "for today's weather"
+            planning_context = "This is the current weather, so the suggestion should be immediately actionable."
+
+        return _SUGGESTION_PREAMBLE + _SUGGESTION_TAIL.format(
+            city=city,
+            temp=weather['temp'],
+            conditions=weather['conditions'],
+            planning_context=planning_context,
+            search_result=search_result,
+            time_context=time_context
+        )
+
+    @staticmethod
+    def _corroborated_suggestion(plan: Dict, search_result: str) -> Optional[str]:
+        """Assemble the suggestion locally when the search results mention
+        the planned tentative activity"""
+        tentative = str(plan.get("activity") or "").strip()
+        if not tentative or tentative.lower() not in search_result.lower():
+            return None
+        print(f"✓ Search results corroborate: {tentative}")
+        why = str(plan.get("why") or "").strip()
+        suggestion = f"\n\nRecommended Activity: {tentative}"
+        if why:
+            suggestion += f"\n{why}"
+        return suggestion
+
+    def get_activity_suggestions_batch(self, city: str,
+                                       weather_list: List[dict]) -> List[Optional[str]]:
+        """Suggest one activity per forecast day with one search and one LLM call
+
+        A single Brave search fetches the city's attractions and a single
+        prompt enumerates every day's weather, asking for a JSON array whose
+        element i answers day i - O(1) round-trips instead of O(days). Falls
+        back to the per-day path when the array can't be parsed.
+        """
+        search_result = self.brave_search.search(f"top attractions {city}")
+        if search_result:
+            days = "\n".join(f"{i}: {w['temp']}°C, {w['conditions']}"
+                             for i, w in enumerate(weather_list))
+            prompt = f"""For {city}, with these attractions from a web search:
+{search_result}
+
+Suggest ONE specific weather-appropriate attraction or activity per day.
+Weather per day:
+{days}
+
+Respond with ONLY a JSON array of exactly {len(weather_list)} strings, where
+element i is a short recommendation (the activity plus one sentence of
+reasoning) for day i.
+"""
+            response = self.llm.generate(prompt=prompt, operation="search_and_suggest")
+            if response and 'choices' in response:
+                try:
+                    suggestions = json.loads(response['choices'][0]['message']['content'].strip())
+                except ValueError:
+                    suggestions = None
+                if isinstance(suggestions, list) and len(suggestions) == len(weather_list):
+                    return [f"\n\nRecommended Activity: {s}" if s else None
+                            for s in suggestions]
+
+        # Degenerate case: one round-trip per day, same as calling the
+        # single-day method in a loop
+        print("⚠️ Batch suggestion unavailable; falling back to per-day suggestions")
+        return [self.get_activity_suggestion(city, w, is_forecast=True)
+                for w in weather_list]
+
+    async def aget_activity_suggestion(self, city: str, weather: dict,
+                                       is_forecast: bool = False,
+                                       precomputed_search: Optional[str] = None) -> Optional[str]:
+        """Async wrapper: run the suggestion pipeline on a worker thread
+
+        Lets batch drivers overlap many cities, e.g.
+        asyncio.gather(*(s.aget_activity_suggestion(c, w) for c, w in jobs)).
+        The underlying HTTP stack is synchronous (pooled requests sessions),
+        so a thread per in-flight suggestion is the honest concurrency model.
+        """
+        return await asyncio.to_thread(self.get_activity_suggestion, city, weather,
+                                       is_forecast, precomputed_search)
+
+    def _log_llm_cost(self, label: str) -> None:
+        """Print usage for the most recent LLM call (no-op without a tracker)"""
+        if not self._track_cost:
+            return
+        last_call = getattr(self.llm.cost_tracker, 'last_call_info', None)
+        if not last_call or not isinstance(getattr(last_call, 'cost', None), (int, float)):
+            return  # nothing logged yet, or a fully mocked client in tests
+        total = last_call.input_tokens + last_call.output_tokens
+        print(f"💰 LLM call ({label}): {total} tokens ({last_call.input_tokens} input, "
+              f"{last_call.output_tokens} output) - Cost: ${last_call.cost:.5f}")
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Response-cache observability, delegated to the LLM client
+        (suggester calls are cached there, not here)"""
+        stats_fn = getattr(self.llm, 'cache_stats', None)
+        return stats_fn() if callable(stats_fn) else None
+
+    def _plan_search_and_activity(self, city: str, weather: dict) -> Dict:
+        """One LLM call returning a tentative activity and its rationale
+
+        Returns a dict with 'activity' and 'why' keys, or {} when the reply
+        can't be parsed - callers then fall back to the full suggestion
+        prompt over the search results.
+        """
+        print("\n🤔 Thinking: Planning a tentative activity...")
+
+        plan_prompt = f"""
 Given these weather conditions for {city}:
 - Temperature: {weather['temp']}°C
 - Conditions: {weather['conditions']}
 
-Generate 3-5 specific search terms that would help find weather-appropriate attractions.
-Consider both the temperature and weather conditions to suggest terms that would lead to comfortable activities.
-
-Examples:
-- If it's raining: indoor museum gallery theater covered
-- If it's hot (>30°C): air-conditioned indoor aquarium mall shade
-- If it's cold (<5°C): indoor warm cozy museum cafe
-- If it's pleasant: outdoor park garden walking sightseeing
+Respond with ONLY a JSON object in this exact format:
+{{
+  "activity": "one specific well-known attraction in {city} that fits this weather",
+  "why": "one sentence on why it suits these conditions"
+}}
 
-Respond with ONLY the search terms, separated by spaces. Keep it brief (max 7 words).
-Do NOT include quotes or multiple lines in your response.
+Pick indoor attractions when it is raining, snowing, very hot or very cold,
+and outdoor ones when the weather is pleasant.
 """
-        
-        search_terms_response = self.llm.generate(
-            prompt=weather_prompt,
-            operation="search_terms"  # Using the new operation setting
+
+        response = self.llm.generate(
+            prompt=plan_prompt,
+            operation="search_and_suggest"
         )
-        
-        # Display token usage for the search terms generation
-        if hasattr(self.llm, 'cost_tracker') and hasattr(self.llm.cost_tracker, 'last_call_info'):
-            last_call = self.llm.cost_tracker.last_call_info
-            input_tokens = last_call.get('input_tokens', 0)
-            output_tokens = last_call.get('output_tokens', 0)
-            cost = last_call.get('cost', 0)
-            print(f"💰 LLM call (search terms): {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
-        
-        # Extract search terms from the response and clean them
-        search_terms = ""
-        if search_terms_response and 'choices' in search_terms_response:
-            raw_terms = search_terms_response['choices'][0]['message']['content'].strip()
-            
-            # Clean up the terms - remove quotes, newlines, and extra spaces
-            search_terms = raw_terms.replace('"', '').replace('\n', ' ').strip()
-            
-            # If we have multiple lines or suggestions, just take the first set of terms
-            if '\n' in search_terms:
-                search_terms = search_terms.split('\n')[0].strip()
-                
-            print(f"🔍 Generated search terms: {search_terms}")
-        
-        # 2. Use the generated search terms to create a more targeted query
-        query = f"{search_terms} attractions {city}"
+
+        # Display token usage for the combined planning call
+        self._log_llm_cost("combined plan")
+
+        if response and 'choices' in response:
+            raw = response['choices'][0]['message']['content'].strip()
+            try:
+                plan = json.loads(raw)
+            except ValueError:
+                print("⚠️ Could not parse combined plan response")
+                return {}
+            if isinstance(plan, dict):
+                return plan
+        return {}
+
+    # Launch the generic fallback only once the targeted search has stalled
+    # this long (seconds) - a fast happy path never pays the second API call
+    SEARCH_HEDGE_TIMEOUT = 0.8
+
+    def _run_search(self, city: str, search_terms: str) -> Optional[str]:
+        """Run the targeted Brave search with a hedged fallback
+
+        The generic fallback query launches only when the targeted search
+        misses or stalls past SEARCH_HEDGE_TIMEOUT, so a prompt hit costs a
+        single API call; once hedged, the two run concurrently and the
+        last-resort simple query stays sequential.
+        """
+        query = f"{search_terms} attractions {city}".strip()
         print(f"🔍 Creating search query: '{query}'")
-        
-        # 3. Perform the search using Brave Search API
         print("🔎 Executing Brave search...")
-        search_result = self.brave_search.search(query)
-        
+        fallback_query = f"most famous landmarks monuments museums attractions {city}"
+        fallback_future = None
+
+        primary_future = self._pool.submit(self.brave_search.search, query)
+        try:
+            search_result = primary_future.result(timeout=self.SEARCH_HEDGE_TIMEOUT)
+        except FutureTimeoutError:
+            # Primary is stalling - hedge with the generic query in parallel
+            print(f"🔍 Hedging with fallback search: '{fallback_query}'")
+            fallback_future = self._pool.submit(self.brave_search.search, fallback_query)
+            search_result = primary_future.result()
+
         if not search_result:
-            # Fallback to a more generic query if the specific one fails
-            query = f"most famous landmarks monuments museums attractions {city}"
-            print(f"🔍 Fallback search: '{query}'")
-            search_result = self.brave_search.search(query)
-            
+            print(f"🔍 Fallback search: '{fallback_query}'")
+            if fallback_future is None:
+                fallback_future = self._pool.submit(self.brave_search.search, fallback_query)
+            search_result = fallback_future.result()
+
             # Try one more time with a simpler query if still no results
             if not search_result:
                 query = f"tourist attractions {city}"
@@ -92,36 +326,17 @@ Do NOT include quotes or multiple lines in your response.
                 if not search_result:
                     print("❌ All searches failed. No results found.")
                     return None
-        
+
+        return search_result
+
+    def _suggest_from_search(self, city: str, weather: dict, is_forecast: bool,
+                             search_result: str) -> Optional[str]:
+        """Ask the LLM for one activity suggestion based on search results"""
         # 4. Now that we have search results, use LLM to analyze and suggest activities
         print("\n🤔 Thinking: Analyzing weather conditions and search results...")
         print("🧠 Using language model to generate activity suggestion")
         
-        # Adjust prompt based on whether this is current or forecast data
-        if is_forecast:
-            time_context = "for the forecasted weather"
-            planning_context = "This is a future forecast, so the suggestion should be appropriate for planning ahead."
-        else:
-            time_context = "for today's weather"
-            planning_context = "This is the current weather, so the suggestion should be immediately actionable."
-        
-        prompt = f"""You are a deep local person from {city} with multiple years of experience. You are the expert in {city} and with your answers you need to impress a tourist to your city.
-
-Given the weather conditions and search results for {city}, suggest ONE specific attraction or activity that would be most appropriate {time_context}.
-
-Weather conditions: {weather['temp']}°C, {weather['conditions']}
-{planning_context}
-
-Search results about {city}:
-{search_result}
-
-Based on these weather conditions and the search results, what ONE specific activity or attraction would you recommend to a visitor to {city}? 
-Explain why it's a good choice given the current weather conditions.
-
-Your response should be in this format:
-"\n\nRecommended Activity: [Your specific activity recommendation]
-[2-3 sentences explaining why this is a good choice for the weather conditions]"
-"""
+        prompt = self._build_suggestion_prompt(city, weather, is_forecast, search_result)
 
         response = self.llm.generate(
             prompt=prompt,
@@ -129,12 +344,7 @@ Your response should be in this format:
         )
         
         # Display token usage and cost information
-        if hasattr(self.llm, 'cost_tracker') and hasattr(self.llm.cost_tracker, 'last_call_info'):
-            last_call = self.llm.cost_tracker.last_call_info
-            input_tokens = last_call.get('input_tokens', 0)
-            output_tokens = last_call.get('output_tokens', 0)
-            cost = last_call.get('cost', 0)
-            print(f"💰 LLM call (activity suggestion): {input_tokens + output_tokens} tokens ({input_tokens} input, {output_tokens} output) - Cost: ${cost:.5f}")
+        self._log_llm_cost("activity suggestion")
         
         if response and 'choices' in response:
             suggestion = response['choices'][0]['message']['content'].strip()
@@ -0,0 +1,39 @@
+"""Local index of well-known city names used to skip LLM verification"""
+
+from pathlib import Path
+from typing import Optional
+
+_CITIES_PATH = Path(__file__).parent / "cities.txt"
+
+# Loaded lazily on first lookup so importing the module stays free
+_city_index: Optional[frozenset] = None
+
+# Cities confirmed by the LLM during this session - later queries for them
+# skip verification (and even the SQLite cache lookup) entirely
+_runtime_cities: set = set()
+
+
+def _load_index() -> frozenset:
+    global _city_index
+    if _city_index is None:
+        with open(_CITIES_PATH, encoding="utf-8") as f:
+            _city_index = frozenset(
+                line.strip().lower() for line in f
+                if line.strip() and not line.startswith('#')
+            )
+    return _city_index
+
+
+def is_known_city(name: str) -> bool:
+    """Check whether a name is a well-known city (case-insensitive)
+
+    A hit means the name can be used directly without paying an LLM
+    verification roundtrip; a miss just means we fall back to the LLM.
+    """
+    normalized = name.lower().strip()
+    return normalized in _runtime_cities or normalized in _load_index()
+
+
+def remember_city(name: str) -> None:
+    """Record an LLM-confirmed city name for the rest of the session"""
+    _runtime_cities.add(name.lower().strip())
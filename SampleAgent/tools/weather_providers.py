@@ -1,14 +1,52 @@
 from abc import ABC, abstractmethod
+from typing import Optional, TypedDict
 import os
+import time
 import requests
 
+try:
+    import orjson as _json  # parses response bytes directly, 2-5x faster
+except ImportError:
+    import json as _json
+
+# Connect/read timeouts for the weather APIs - fail fast on dead hosts
+# instead of hanging the whole query
+REQUEST_TIMEOUT = (3, 10)
+
+
+class WeatherData(TypedDict):
+    """Current-conditions payload; None fields signal a failed fetch"""
+    temp: Optional[float]
+    humidity: Optional[float]
+    conditions: Optional[str]
+
 class WeatherProvider(ABC):
     """Abstract base class for weather providers"""
-    
+
+    # Current conditions barely move inside five minutes; keying the memo by
+    # (city, time bucket) makes entries expire without any TTL bookkeeping
+    CURRENT_WEATHER_TTL = 300
+
+    def get_current_weather(self, city: str) -> WeatherData:
+        """Get current weather for a city, memoized per 5-minute bucket
+        Returns: dict with 'temp', 'humidity', 'conditions' (None on failure)"""
+        bucket = int(time.time() // self.CURRENT_WEATHER_TTL)
+        key = (city.lower(), bucket)
+        cache = getattr(self, '_current_cache', None)
+        if cache is None:
+            cache = self._current_cache = {}
+        if (cached := cache.get(key)) is not None:
+            return cached
+        result = self._fetch_current_weather(city)
+        if result.get('temp') is not None:
+            if len(cache) > 64:
+                cache.clear()  # old buckets never hit again; cheap reset
+            cache[key] = result
+        return result
+
     @abstractmethod
-    def get_current_weather(self, city: str) -> dict:
-        """Get current weather for a city
-        Returns: dict with 'temp', 'humidity', 'conditions'"""
+    def _fetch_current_weather(self, city: str) -> WeatherData:
+        """Fetch current weather from the upstream API"""
         pass
         
     @abstractmethod
@@ -24,12 +62,15 @@ class WeatherProvider(ABC):
 
 class OpenWeatherProvider(WeatherProvider):
     """OpenWeather API implementation"""
-    
-    def __init__(self, api_key: str):
+
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.base_endpoint = "api.openweathermap.org"
-    
-    def get_current_weather(self, city: str) -> dict:
+        # Reuse the caller's pooled session when provided so repeated calls
+        # keep the TCP+TLS connection alive instead of re-handshaking
+        self.session = session or requests.Session()
+
+    def _fetch_current_weather(self, city: str) -> WeatherData:
         try:
             weather_url = f"https://{self.base_endpoint}/data/2.5/weather"
             params = {
@@ -38,12 +79,12 @@ class OpenWeatherProvider(WeatherProvider):
                 'units': 'metric'
             }
             
-            response = requests.get(weather_url, params=params)
+            response = self.session.get(weather_url, params=params, timeout=REQUEST_TIMEOUT)
             if response.status_code != 200:
                 print(f"Error from OpenWeather API: {response.status_code} - {response.text}")
                 return self._create_error_response()
             
-            data = response.json()
+            data = _json.loads(response.content)
             return {
                 'temp': data['main']['temp'],
                 'humidity': data['main']['humidity'],
@@ -53,11 +94,13 @@ class OpenWeatherProvider(WeatherProvider):
             print(f"Error getting weather from OpenWeather: {e}")
             return self._create_error_response()
     
-    def _create_error_response(self) -> dict:
+    def _create_error_response(self) -> WeatherData:
+        # None (not a sentinel string) so numeric consumers can gate on it
+        # without re-coercing
         return {
-            'temp': 'unknown',
-            'humidity': 'unknown',
-            'conditions': 'Could not retrieve weather data'
+            'temp': None,
+            'humidity': None,
+            'conditions': None
         }
 
     def get_forecast(self, city: str, days: int = 5) -> list:
@@ -71,45 +114,37 @@ class OpenWeatherProvider(WeatherProvider):
                 'cnt': min(days * 8, 40)  # OpenWeather provides 3-hour forecasts, 8 per day, max 5 days
             }
             
-            response = requests.get(forecast_url, params=params)
+            response = self.session.get(forecast_url, params=params, timeout=REQUEST_TIMEOUT)
             if response.status_code != 200:
                 print(f"Error from OpenWeather API: {response.status_code} - {response.text}")
                 return []
             
-            data = response.json()
-            
-            # Process the forecast data
-            forecasts = []
-            current_day = None
-            day_data = None
-            
+            data = _json.loads(response.content)
+
+            # Aggregate the 3-hourly slots into days in one pass over a dict
+            # keyed by date - no reliance on the list being day-ordered and
+            # no per-slot day-boundary branch. dt_txt is "YYYY-MM-DD HH:MM:SS",
+            # so a [:10] slice gets the date without allocating a split list.
+            days_by_date = {}
             for item in data['list']:
-                # Extract date in YYYY-MM-DD format
-                date = item['dt_txt'].split(' ')[0]
-                
-                # Start a new day if needed
-                if date != current_day:
-                    if day_data:
-                        forecasts.append(day_data)
-                    
-                    current_day = date
-                    day_data = {
-                        'date': date,  # Ensure date is in YYYY-MM-DD format
-                        'min_temp': item['main']['temp_min'],
-                        'max_temp': item['main']['temp_max'],
+                date = item['dt_txt'][:10]
+                main = item['main']
+                day_data = days_by_date.get(date)
+                if day_data is None:
+                    days_by_date[date] = {
+                        'date': date,
+                        'min_temp': main['temp_min'],
+                        'max_temp': main['temp_max'],
                         'conditions': item['weather'][0]['description'],
-                        'humidity': item['main']['humidity']
+                        'humidity': main['humidity']
                     }
                 else:
                     # Update min/max for the day
-                    day_data['min_temp'] = min(day_data['min_temp'], item['main']['temp_min'])
-                    day_data['max_temp'] = max(day_data['max_temp'], item['main']['temp_max'])
-            
-            # Add the last day if it exists
-            if day_data:
-                forecasts.append(day_data)
-                
-            return forecasts[:days]  # Limit to requested number of days
+                    day_data['min_temp'] = min(day_data['min_temp'], main['temp_min'])
+                    day_data['max_temp'] = max(day_data['max_temp'], main['temp_max'])
+
+            # Dicts preserve insertion order, and slots arrive chronologically
+            return list(days_by_date.values())[:days]  # Limit to requested number of days
             
         except Exception as e:
             print(f"Error getting forecast from OpenWeather: {e}")
@@ -117,12 +152,15 @@ class OpenWeatherProvider(WeatherProvider):
 
 class WeatherAPIProvider(WeatherProvider):
     """WeatherAPI.com implementation"""
-    
-    def __init__(self, api_key: str):
+
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.base_endpoint = "api.weatherapi.com/v1"
-    
-    def get_current_weather(self, city: str) -> dict:
+        # Reuse the caller's pooled session when provided so repeated calls
+        # keep the TCP+TLS connection alive instead of re-handshaking
+        self.session = session or requests.Session()
+
+    def _fetch_current_weather(self, city: str) -> WeatherData:
         try:
             weather_url = f"https://{self.base_endpoint}/current.json"
             params = {
@@ -130,12 +168,12 @@ class WeatherAPIProvider(WeatherProvider):
                 'q': city
             }
             
-            response = requests.get(weather_url, params=params)
+            response = self.session.get(weather_url, params=params, timeout=REQUEST_TIMEOUT)
             if response.status_code != 200:
                 print(f"Error from WeatherAPI: {response.status_code} - {response.text}")
                 return self._create_error_response()
             
-            data = response.json()
+            data = _json.loads(response.content)
             return {
                 'temp': data['current']['temp_c'],
                 'humidity': data['current']['humidity'],
@@ -145,11 +183,13 @@ class WeatherAPIProvider(WeatherProvider):
             print(f"Error getting weather from WeatherAPI: {e}")
             return self._create_error_response()
     
-    def _create_error_response(self) -> dict:
+    def _create_error_response(self) -> WeatherData:
+        # None (not a sentinel string) so numeric consumers can gate on it
+        # without re-coercing
         return {
-            'temp': 'unknown',
-            'humidity': 'unknown',
-            'conditions': 'Could not retrieve weather data'
+            'temp': None,
+            'humidity': None,
+            'conditions': None
         }
 
     def get_forecast(self, city: str, days: int = 5) -> list:
@@ -162,12 +202,12 @@ class WeatherAPIProvider(WeatherProvider):
                 'days': min(days, 10)  # WeatherAPI.com allows up to 10 days forecast
             }
             
-            response = requests.get(forecast_url, params=params)
+            response = self.session.get(forecast_url, params=params, timeout=REQUEST_TIMEOUT)
             if response.status_code != 200:
                 print(f"Error from WeatherAPI: {response.status_code} - {response.text}")
                 return []
             
-            data = response.json()
+            data = _json.loads(response.content)
             
             # Process the forecast data
             forecasts = []